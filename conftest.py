@@ -0,0 +1,3 @@
+# The suite's fixtures, options and hooks live in the tests/plugin.py pytest plugin.
+# As the root conftest, this file also puts the project root on sys.path for `pages` and `tests` imports.
+pytest_plugins = ["tests.plugin"]
@@ -1,7 +1,17 @@
-import requests
 import logging
 import os
+import time
+from urllib.parse import unquote
 from playwright.sync_api import Page, Locator, expect
+from .host_policy import HostPolicy
+from .link_checker import LinkChecker, LinkCheckResult, get_link_checker
+from .link_results import get_link_result_store
+from .link_manifest import get_text_matcher, load_link_manifest, normalize_text
+from .evidence import get_evidence_service
+from .tab_state import get_tab_state_store
+from .tracing import get_tracer
+from .resource_blocking import DEFAULT_BLOCKING_PROFILE, blocking_mode, get_blocking_stats, should_block
+from .wait_stats import get_wait_stats
 
 logger = logging.getLogger("SystemFlowLogger")
 
@@ -10,11 +20,88 @@ class BasePage:
     Base class for all Page Objects using Playwright.
     """
     
+    MODULE_NAME = "base"
     DEFAULT_WAIT_TIME = 10000  # 10 seconds in milliseconds
-    MENIV_DOMAIN = "meniv-rishon.co.il"
+    DEFAULT_TIMEOUT = DEFAULT_WAIT_TIME
+
+    GENERIC_LINK_XPATH = "//*[contains(@role, 'button') or self::a][contains(normalize-space(.), '{}')]"
+    LINK_ELEMENTS_CSS = "a, [role*='button']"
+    LINKS_MUST_BE_VISIBLE = True
+
+    # "intercept": read a popup's URL from its first document request and abort it; "load": open the page fully
+    POPUP_VERIFY_MODE = os.getenv("POPUP_VERIFY_MODE", "intercept").strip().lower()
+    POPUP_MAX_REDIRECTS = 10
+
+    # How the default _verify_external_link treats a module's links
+    FORCE_POPUP_CLICK = False     # click through overlapping elements to open a popup
+    RELATIVE_HREFS_MATCH = False  # an href without a scheme can already show the destination
+    POPUP_MISMATCH_FAILS = False  # a popup that lands elsewhere fails the link instead of a warning
+
+    # Requests aborted by go_to_url() (see pages/resource_blocking.py).
+    # Page objects override it per module; None opts the module out entirely.
+    BLOCKING_PROFILE = DEFAULT_BLOCKING_PROFILE
+
+    # Collects every link-like element on the page in a single browser round trip
+    HARVEST_LINKS_SCRIPT = """
+    (selector) => Array.from(document.querySelectorAll(selector)).map(el => {
+        const rect = el.getBoundingClientRect();
+        const style = window.getComputedStyle(el);
+        return {
+            text: (el.textContent || "").replace(/\\s+/g, " ").trim(),
+            href: el.getAttribute("href") || "",
+            onclick: el.getAttribute("onclick") || "",
+            visible: rect.width > 0 && rect.height > 0 && style.visibility !== "hidden" && style.display !== "none",
+        };
+    })
+    """
+
+    # Resolves as soon as any of the expected (normalized) link texts is present on the page
+    ANY_LINK_TEXT_PRESENT_SCRIPT = """
+    ([selector, texts]) => Array.from(document.querySelectorAll(selector)).some(el => {
+        const text = (el.textContent || "")
+            .replace(/[\\u0591-\\u05BD\\u05BF\\u05C1\\u05C2\\u05C4\\u05C5\\u05C7\\u061C\\u200B-\\u200F\\u202A-\\u202E\\u2066-\\u2069\\uFEFF]/g, "")
+            .replace(/\\u05F4/g, '"').replace(/\\u05F3/g, "'")
+            .replace(/\\s+/g, " ");
+        return texts.some(t => text.includes(t));
+    })
+    """
     
+    # Resolves when a clicked tab is selected (if it is an ARIA tab) and its panel is visible
+    TAB_READY_SCRIPT = """
+    (tab) => {
+        const selected = tab.getAttribute("aria-selected");
+        const panelId = tab.getAttribute("aria-controls");
+        const panel = panelId ? document.getElementById(panelId) : document.querySelector("[role='tabpanel']:not([hidden])");
+        const panelVisible = !panel || panel.getClientRects().length > 0;
+        return (selected === null || selected === "true") && panelVisible;
+    }
+    """
+
+    # Resolves once the DOM under the observed node changed after install_dom_observer()
+    DOM_OBSERVER_SCRIPT = """
+    (selector) => {
+        window.__municheckDomChanged = false;
+        const target = (selector && document.querySelector(selector)) || document.body;
+        const observer = new MutationObserver(() => { window.__municheckDomChanged = true; observer.disconnect(); });
+        observer.observe(target, { childList: true, subtree: true, attributes: true, characterData: true });
+    }
+    """
+    DOM_CHANGED_SCRIPT = "() => window.__municheckDomChanged === true"
+
     def __init__(self, page: Page):
         self.page = page
+        self.current_tab = None
+        self.failed_links = []
+        # How the link being verified was decided, for its LinkResult record (see resolve_popup_url)
+        self._verified_via = "attributes"
+        self._verified_url = None
+
+    def span(self, name, allure_step=False, **attributes):
+        """
+        Timing span for an operation of this module, tagged with the current tab unless `tab` is given.
+        """
+        attributes.setdefault("tab", self.current_tab)
+        return get_tracer().span(name, allure_step=allure_step, module=self.MODULE_NAME, **attributes)
 
     def dismiss_cookie_banner(self):
         """
@@ -29,49 +116,479 @@ class BasePage:
             # We ignore failures here as cookie banners might not be present
             pass
 
-    def validate_link_status(self, url):
+    def validate_link_status(self, url, link_text=None):
+        """
+        Performs an HTTP request to check if a link is alive, the way the host policy says (see HostPolicy).
+        """
+        checker = get_link_checker()
+        rule = checker.host_policy.rule_for(url)
+        result = self._check_in_browser(url, rule) if rule.strategy == HostPolicy.BROWSER else checker.check(url)
+        self._record_http_result(result, link_text)
+        return result.ok, result.status
+
+    def validate_links_status(self, urls, link_texts=None):
+        """
+        Checks a batch of links concurrently through the shared link checker.
+        Links whose host must be checked from the browser are checked one by one afterwards.
+        `link_texts` optionally maps each URL to its link text for the result records.
+        Returns a dict of url -> (is_success, status).
+        """
+        checker = get_link_checker()
+        link_texts = link_texts or {}
+        in_browser = [url for url in urls if checker.host_policy.rule_for(url).strategy == HostPolicy.BROWSER]
+        results = checker.check_many([url for url in urls if url not in in_browser])
+        for url in dict.fromkeys(in_browser):
+            results[url] = self._check_in_browser(url, checker.host_policy.rule_for(url))
+
+        for url, result in results.items():
+            self._record_http_result(result, link_texts.get(url))
+        return {url: (result.ok, result.status) for url, result in results.items()}
+
+    def _check_in_browser(self, url, rule):
+        """
+        Checks a link with the browser context's own request client (its cookies and TLS stack),
+        for hosts that refuse plain HTTP clients. Results share the URL status cache.
+        """
+        cache = get_link_checker().cache
+        cached = cache.get(url, verify=rule.verify_tls) if cache is not None else None
+        if cached:
+            return LinkCheckResult(url, cached["ok"], cached["status"], "cache")
+
+        started = time.monotonic()
+        with self.span("browser_check", url=url):
+            try:
+                response = self.page.context.request.get(
+                    url,
+                    timeout=(rule.timeout or LinkChecker.DEFAULT_TIMEOUT) * 1000,
+                    ignore_https_errors=not rule.verify_tls,
+                    max_redirects=self.POPUP_MAX_REDIRECTS,
+                )
+                is_success, status = response.status == 200, response.status
+                response.dispose()
+            except Exception as e:
+                is_success, status = False, str(e)
+
+        if cache is not None:
+            cache.put(url, is_success, status, verify=rule.verify_tls)
+        return LinkCheckResult(url, is_success, status, HostPolicy.BROWSER, time.monotonic() - started)
+
+    def _record_http_result(self, result, link_text=None, attempts=1, verification=None, verify=True, timeout=None):
+        """
+        Stores an HTTP check in the run's LinkResultStore. A failed check also counts against the current tab.
+        When the check follows up a link's verification on the page (`verification`, its LinkResult),
+        that record takes the HTTP outcome instead of a second record being added for the same link.
+        `verify` and `timeout` are the options the check was requested with, kept for its retries.
+        """
+        store = get_link_result_store()
+        if verification is not None:
+            record = store.update(verification, url=result.url, status=result.status, ok=result.ok,
+                                  strategy=result.strategy, latency=verification.latency + result.latency,
+                                  attempts=attempts, verify=verify, timeout=timeout)
+        else:
+            record = store.record(
+                self.MODULE_NAME, self.current_tab, link_text, result.url, result.status, result.ok,
+                result.strategy, result.latency, attempts, verify, timeout,
+            )
+        if not result.ok:
+            self.failed_links.append(result.url)
+            if record is not None:
+                logger.warning(f"⚠️ Broken link recorded: URL: {result.url} | Reason/Status: {result.status}")
+
+    def harvest_links(self, wait_for_texts=None, timeout=None):
+        """
+        Returns a snapshot of every anchor and [role=button] on the page:
+        [{"text", "href", "onclick", "visible"}, ...].
+        If `wait_for_texts` is given, first waits (once) until any of them has rendered.
+        """
+        if wait_for_texts:
+            started = time.monotonic()
+            try:
+                self.page.wait_for_function(
+                    self.ANY_LINK_TEXT_PRESENT_SCRIPT,
+                    arg=[self.LINK_ELEMENTS_CSS, [normalize_text(text) for text in wait_for_texts]],
+                    timeout=timeout or self.DEFAULT_TIMEOUT,
+                )
+            except Exception:
+                logger.warning("⚠️ None of the expected links rendered in time, checking the page as is.")
+            finally:
+                self._record_wait("signal_wait", started)
+
+        return self.page.evaluate(self.HARVEST_LINKS_SCRIPT, self.LINK_ELEMENTS_CSS)
+
+    def verify_links(self, links, tab=None):
+        """
+        Verifies a whole {link_text: expected_url_part} dictionary against one DOM snapshot.
+        All link texts are matched in a single pass over the harvested links.
+        `tab` names the tab being checked (manifest key). A tab whose links are unchanged since a passing
+        run, with all its target URLs still fresh in the status cache, is skipped (see TabStateStore).
+        Returns {link_text: <result of _verify_external_link>}, or {} when the tab was skipped.
+        """
+        if tab is not None:
+            self.current_tab = tab
+
+        with self.span("verify_links", links=len(links)) as span:
+            with self.span("harvest_links"):
+                harvested = self.harvest_links(wait_for_texts=links.keys())
+            candidates = get_text_matcher(links).match([link["text"] for link in harvested])
+            picked = {link_text: self._pick_link(harvested, candidates[link_text]) for link_text in links}
+
+            tab_state = get_tab_state_store()
+            digest = tab_state.digest(links, picked)
+            unchanged = tab_state.unchanged_entry(self.MODULE_NAME, self.current_tab, digest)
+            if unchanged:
+                tab_state.record_skip(self.MODULE_NAME, self.current_tab, unchanged)
+                if span is not None:
+                    span.attributes["skipped"] = True
+                return {}
+
+            results, records = {}, {}
+            for link_text, expected_url_part in links.items():
+                results[link_text], records[link_text] = self._verify_and_record(link_text, expected_url_part, picked[link_text])
+            self._finish_link_checks(results, records)
+
+            tab_state.remember(self.MODULE_NAME, self.current_tab, digest, self.tab_passed(), self._http_checked_urls())
+            return results
+
+    def _http_checked_urls(self):
+        """
+        Target URLs of the current tab whose status was checked over HTTP (not skipped by host policy).
+        """
+        return [
+            record.url
+            for record in get_link_result_store().query(module=self.MODULE_NAME, tab=self.current_tab)
+            if record.is_http_check and record.url and record.status != LinkChecker.SKIPPED_STATUS
+        ]
+
+    def tab_passed(self, tab=None):
+        """
+        Whether every link recorded for the tab (the current one by default) passed, retries included.
+        """
+        tab = self.current_tab if tab is None else tab
+        return not get_link_result_store().query(module=self.MODULE_NAME, tab=tab, ok=False)
+
+    def retry_links(self, records, attempt):
+        """
+        Verifies the links of failed records again on the current tab, as retry number `attempt`,
+        updating each record in place. Returns the records that passed this time.
+        """
+        links = load_link_manifest().links(self.MODULE_NAME, self.current_tab)
+        retried = {record.link_text: record for record in records if record.link_text in links}
+        harvested = self.harvest_links(wait_for_texts=retried.keys())
+        candidates = get_text_matcher(retried).match([link["text"] for link in harvested])
+        recovered = []
+        for link_text, record in retried.items():
+            link = self._pick_link(harvested, candidates[link_text])
+            self._verify_and_record(link_text, links[link_text], link, retry_of=record, attempt=attempt)
+            if record.ok:
+                recovered.append(record)
+        return recovered
+
+    def _verify_and_record(self, link_text, expected_url_part, link, retry_of=None, attempt=1):
+        """
+        Runs _verify_external_link for one link and stores the outcome as a LinkResult.
+        The link failed if its verification recorded a failure (screenshot or broken link).
+        A retry (`retry_of`, the failed record) updates that record instead of adding one.
+        Returns (result of _verify_external_link, the LinkResult or None if it was a duplicate).
+        """
+        self._verified_via = "attributes"
+        self._verified_url = link["href"] if link else None
+        failures_before = len(self.failed_links)
+        started = time.monotonic()
+        with self.span("link_verify", link=link_text, attempt=attempt):
+            result = self._verify_external_link(link_text, expected_url_part, link)
+
+        ok = len(self.failed_links) == failures_before
+        status = "verified" if ok else ("not_found" if link is None else "failed")
+        latency = time.monotonic() - started
+        if retry_of is not None:
+            get_link_result_store().update(retry_of, ok=ok, status=status, strategy=self._verified_via,
+                                           url=self._verified_url or None, latency=latency, attempts=attempt)
+            return result, retry_of
+        record = get_link_result_store().record(self.MODULE_NAME, self.current_tab, link_text, self._verified_url or None,
+                                                status, ok, self._verified_via, latency)
+        return result, record
+
+    def _finish_link_checks(self, results, records):
+        """
+        Hook for work batched over a whole tab after every link was verified (e.g. concurrent HTTP checks).
+        `records` maps each link text to the LinkResult of its verification (None for a duplicate).
+        """
+
+    def _pick_link(self, harvested, positions):
+        """
+        Picks the first visible match; hidden ones are only accepted when LINKS_MUST_BE_VISIBLE is off.
+        """
+        for position in positions:
+            if harvested[position]["visible"]:
+                return harvested[position]
+        if positions and not self.LINKS_MUST_BE_VISIBLE:
+            return harvested[positions[0]]
+        return None
+
+    def _verify_external_link(self, link_text, expected_url_part, link):
         """
-        Performs an HTTP request to check if a link is alive.
+        Checks one harvested link (None when it was not found): its href when that already shows the expected
+        destination, otherwise the URL of the popup it opens. A missing link or a popup that fails to open is
+        screenshotted. Modules tune it with FORCE_POPUP_CLICK, RELATIVE_HREFS_MATCH and POPUP_MISMATCH_FAILS,
+        or override it for checks of their own (Water checks attributes, then HTTP status).
         """
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        }
-        run_env = os.getenv("RUN_ENV", "").strip().lower()
-        if run_env == "server" and self.MENIV_DOMAIN in str(url).lower():
-            logger.info(f"⏭️ Skipping HTTP 200 validation for '{self.MENIV_DOMAIN}' on server run: {url}")
-            return True, "SKIPPED_SERVER_MENIV"
-        
+        logger.info(f"Testing: {link_text}")
+
+        if link is None:
+            logger.error(f"❌ Link error: '{link_text}' (Element not found)")
+            self._take_error_screenshot(link_text)
+            return
+
+        href = link["href"]
+        if href and (self.RELATIVE_HREFS_MATCH or "http" in href) and self._url_contains(href, expected_url_part):
+            logger.info(f"✅ Passed (HREF check): {link_text}")
+            return
+
         try:
-            response = requests.head(url, allow_redirects=True, timeout=5, headers=headers)
-            if response.status_code >= 400:
-                response = requests.get(url, allow_redirects=True, timeout=5, stream=True, headers=headers)
-            
-            is_success = response.status_code == 200
-            
-            if not is_success:
-                self._record_broken_link(url, response.status_code)
-                
-            return is_success, response.status_code
-            
+            popup_url = self.resolve_popup_url(link_text, expected_url_part, force_click=self.FORCE_POPUP_CLICK)
         except Exception as e:
-            self._record_broken_link(url, str(e))
-            return False, str(e)
+            logger.error(f"❌ Link error: '{link_text}' (Failed to open/verify). Error: {e}")
+            self._take_error_screenshot(link_text)
+            return
+
+        expected_decoded, current_url = unquote(expected_url_part), unquote(popup_url)
+        if self._url_contains(popup_url, expected_url_part):
+            logger.info(f"✅ Passed: {link_text}")
+        elif self.POPUP_MISMATCH_FAILS:
+            logger.error(f"❌ URL Mismatch for {link_text}\n   Exp: ...{expected_decoded[-30:]}\n   Got: ...{current_url[-30:]}")
+            self._take_error_screenshot(link_text)
+        else:
+            logger.warning(f"⚠️ Warning: {link_text} opened but URL differs.\n   Expected: ...{expected_decoded[-20:]}\n   Got:      ...{current_url[-20:]}")
+
+    def capture_evidence(self, label, reporter=None):
+        """
+        Screenshot of the current page through the shared evidence service (deduplicated, written in the background).
+        """
+        return get_evidence_service().capture(self.page, self.MODULE_NAME, label, reporter)
+
+    def _take_error_screenshot(self, link_name):
+        # Every failure path takes evidence, so this is also where a tab learns it did not pass
+        self.failed_links.append(link_name)
+        self.capture_evidence(link_name)
+
+    def _link_locator(self, link_text):
+        """
+        Locator for a link, used only when it has to be clicked (popup verification).
+        """
+        visible_filter = " >> visible=true" if self.LINKS_MUST_BE_VISIBLE else ""
+        return self.page.locator(f"xpath={self.GENERIC_LINK_XPATH.format(link_text)}{visible_filter}").first
+
+    def resolve_popup_url(self, link_text, expected_url_part=None, force_click=False, timeout=None):
+        """
+        Clicks a link that opens a popup and returns the popup's final URL.
+        In "intercept" mode the popup's document request is resolved at the context level (HTTP redirects
+        included) and aborted, so the destination page never loads. If the resolved URL does not contain
+        `expected_url_part` (e.g. a client-side redirect), the popup is opened again and fully loaded.
+        """
+        timeout = timeout or self.DEFAULT_TIMEOUT
+        self._verified_via = f"popup_{self.POPUP_VERIFY_MODE}"
+        with self.span("popup_verify", link=link_text, mode=self.POPUP_VERIFY_MODE) as span:
+            if self.POPUP_VERIFY_MODE == "intercept":
+                url = self._intercept_popup_url(link_text, force_click, timeout)
+                if url and (expected_url_part is None or self._url_contains(url, expected_url_part)):
+                    self._verified_via, self._verified_url = "popup_intercept", url
+                    return url
+                logger.info(f"↪️ Intercepted popup URL did not match for '{link_text}', loading the page: {url}")
+                if span is not None:
+                    span.attributes["fallback"] = "load"
+            url = self._load_popup_url(link_text, force_click, timeout)
+            self._verified_via, self._verified_url = "popup_load", url
+            return url
+
+    @staticmethod
+    def _url_contains(url, expected_url_part):
+        def clean(value):
+            return unquote(value).replace("https://", "").replace("http://", "").strip()
+        return clean(expected_url_part) in clean(url)
 
-    def _record_broken_link(self, url, reason):
+    def _click_for_popup(self, link_text, force_click, timeout):
+        locator = self._link_locator(link_text)
+        with self.page.expect_popup(timeout=timeout) as popup_info:
+            locator.scroll_into_view_if_needed()
+            locator.click(force=force_click)
+        return popup_info.value
+
+    def _intercept_popup_url(self, link_text, force_click, timeout):
+        """
+        Returns the URL the popup's first document request resolves to, or None when no such request
+        was seen within `timeout` (the caller then loads the popup instead).
         """
-        Records a broken link in a list attached to the page object for reporting.
+        context = self.page.context
+        opener = self.page
+        resolved = {}
+
+        def is_popup_document(request):
+            if not request.is_navigation_request():
+                return False
+            try:
+                frame = request.frame
+            except Exception:
+                # Playwright has no frame yet for a navigation issued before its page exists: a new popup's first document
+                return True
+            return frame.parent_frame is None and frame.page != opener
+
+        def resolve_document_request(route):
+            request = route.request
+            if "url" in resolved or not is_popup_document(request):
+                route.fallback()
+                return
+            try:
+                # Only the final URL is needed: ask for the first bytes so a document is not downloaded whole
+                headers = {**request.headers, "range": f"bytes=0-{LinkChecker.DOCUMENT_PROBE_BYTES - 1}"}
+                response = route.fetch(headers=headers, max_redirects=self.POPUP_MAX_REDIRECTS, timeout=timeout)
+                resolved["url"] = response.url
+                response.dispose()
+            except Exception as e:
+                logger.warning(f"⚠️ Could not resolve popup request for '{link_text}': {e}")
+                resolved["url"] = request.url
+            route.abort("aborted")
+
+        context.route("**/*", resolve_document_request)
+        try:
+            popup = self._click_for_popup(link_text, force_click, timeout)
+            # Route handlers run while the sync API waits, so poll instead of waiting on an event that may never come
+            deadline = time.monotonic() + timeout / 1000
+            while "url" not in resolved and not popup.is_closed() and time.monotonic() < deadline:
+                popup.wait_for_timeout(50)
+        finally:
+            context.unroute("**/*", resolve_document_request)
+
+        try:
+            popup.close()
+        except Exception:
+            pass
+        return resolved.get("url")
+
+    def _load_popup_url(self, link_text, force_click, timeout):
+        popup = self._click_for_popup(link_text, force_click, timeout)
+        try:
+            popup.wait_for_load_state()
+            return popup.url
+        finally:
+            popup.close()
+
+    # --- Readiness API: wait on concrete signals instead of fixed delays ---
+
+    def _record_wait(self, kind, started):
+        get_wait_stats().record(self.MODULE_NAME, kind, time.monotonic() - started)
+
+    def sleep(self, milliseconds):
         """
-        if not hasattr(self.page, 'broken_links_list'):
-            self.page.broken_links_list = []
-            
-        entry = f"URL: {url} | Reason/Status: {reason}"
-        if entry not in self.page.broken_links_list:
-            self.page.broken_links_list.append(entry)
-            logger.warning(f"⚠️ Broken link recorded: {entry}")
+        Fixed delay. Prefer a readiness wait below; every call is counted as wasted wait time.
+        """
+        started = time.monotonic()
+        self.page.wait_for_timeout(milliseconds)
+        self._record_wait("fixed_sleep", started)
+
+    def wait_for_load_state(self, state="load", timeout=None):
+        """
+        Load-state wait ("load", "domcontentloaded", "networkidle"), counted as an idle wait.
+        """
+        started = time.monotonic()
+        try:
+            self.page.wait_for_load_state(state, timeout=timeout)
+        finally:
+            self._record_wait("idle_wait", started)
+
+    def wait_for_response(self, url_part, action, timeout=None):
+        """
+        Runs `action` and waits for the first response whose URL contains `url_part`.
+        """
+        started = time.monotonic()
+        try:
+            with self.page.expect_response(lambda response: url_part in response.url, timeout=timeout or self.DEFAULT_TIMEOUT) as response_info:
+                action()
+            return response_info.value
+        finally:
+            self._record_wait("signal_wait", started)
+
+    def wait_for_dom_change(self, action, selector=None, timeout=None):
+        """
+        Runs `action` and waits until the DOM under `selector` (default: body) mutates.
+        """
+        started = time.monotonic()
+        try:
+            self.page.evaluate(self.DOM_OBSERVER_SCRIPT, selector)
+            action()
+            self.page.wait_for_function(self.DOM_CHANGED_SCRIPT, timeout=timeout or self.DEFAULT_TIMEOUT)
+        finally:
+            self._record_wait("signal_wait", started)
+
+    def wait_for_tab_ready(self, tab_locator, timeout=None):
+        """
+        Waits until a clicked tab is selected and its tab panel is visible.
+        """
+        started = time.monotonic()
+        try:
+            handle = tab_locator.element_handle(timeout=timeout or self.DEFAULT_TIMEOUT)
+            self.page.wait_for_function(self.TAB_READY_SCRIPT, arg=handle, timeout=timeout or self.DEFAULT_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"⚠️ Tab panel did not report ready, continuing: {e}")
+        finally:
+            self._record_wait("signal_wait", started)
+
+    def wait_until_visible(self, locator, timeout=None):
+        """
+        Waits for a specific element to become visible, counted as a signal wait.
+        """
+        started = time.monotonic()
+        try:
+            locator.wait_for(state="visible", timeout=timeout or self.DEFAULT_TIMEOUT)
+        finally:
+            self._record_wait("signal_wait", started)
+
+    def apply_blocking_profile(self):
+        """
+        Installs the resource blocking route on the page and makes this module's profile the active one.
+        The route is installed once per Playwright page and reads the active profile from it,
+        so page objects sharing a page (sequential full flow) each get their own profile.
+        """
+        mode = blocking_mode()
+        if mode == "off":
+            return
+
+        page = self.page
+        page.blocking_profile = (self.MODULE_NAME, self.BLOCKING_PROFILE)
+        if getattr(page, "blocking_route_installed", False):
+            return
+        page.blocking_route_installed = True
+        stats = get_blocking_stats()
+
+        def handle_route(route):
+            module, profile = page.blocking_profile
+            request = route.request
+            if should_block(request.url, request.resource_type, profile):
+                stats.record_request(module, request.resource_type)
+                if mode == "on":
+                    route.abort("blockedbyclient")
+                    return
+            route.fallback()
+
+        def measure_finished(request):
+            # Audit mode: the request went through, count what blocking it would have saved
+            module, profile = page.blocking_profile
+            if should_block(request.url, request.resource_type, profile):
+                try:
+                    sizes = request.sizes()
+                    stats.record_bytes(module, sizes["responseBodySize"] + sizes["responseHeadersSize"])
+                except Exception:
+                    pass
+
+        page.route("**/*", handle_route)
+        if mode == "audit":
+            page.on("requestfinished", measure_finished)
 
     def go_to_url(self, url):
         logger.info(f"Navigating to URL: {url}")
-        self.page.goto(url)
+        self.current_tab = None
+        with self.span("go_to_url", allure_step=True, url=url):
+            self.apply_blocking_profile()
+            self.page.goto(url)
 
     def execute_script(self, script, arg=None):
         return self.page.evaluate(script, arg)
@@ -81,7 +598,8 @@ class BasePage:
         Returns a locator for the given selector and waits for it to be visible.
         """
         locator = self.page.locator(selector)
-        locator.wait_for(state="visible", timeout=timeout or self.DEFAULT_WAIT_TIME)
+        with self.span("get_element", selector=selector):
+            locator.wait_for(state="visible", timeout=timeout or self.DEFAULT_WAIT_TIME)
         return locator
 
     def wait_for_clickable_element(self, selector, timeout=None):
@@ -90,9 +608,11 @@ class BasePage:
         Playwright handles 'clickability' automatically during click().
         """
         locator = self.page.locator(selector)
-        locator.wait_for(state="visible", timeout=timeout or self.DEFAULT_WAIT_TIME)
+        with self.span("wait_for_clickable", selector=selector):
+            locator.wait_for(state="visible", timeout=timeout or self.DEFAULT_WAIT_TIME)
         return locator
 
     def wait_for_url_to_contain(self, url_part, timeout=None):
         import re
-        self.page.wait_for_url(re.compile(f".*{re.escape(url_part)}.*"), timeout=timeout or self.DEFAULT_WAIT_TIME)
+        with self.span("wait_for_url", url_part=url_part):
+            self.page.wait_for_url(re.compile(f".*{re.escape(url_part)}.*"), timeout=timeout or self.DEFAULT_WAIT_TIME)
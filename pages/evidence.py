@@ -0,0 +1,143 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import allure
+except ImportError:  # page objects also run outside pytest
+    allure = None
+
+logger = logging.getLogger("SystemFlowLogger")
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+class EvidenceService:
+    """
+    Failure screenshots for all page objects.
+    One capture per distinct page state: while the DOM (plus URL and scroll position) hashes the same,
+    further failures reuse the previous capture instead of taking another screenshot.
+    The browser encodes the image (JPEG at EVIDENCE_QUALITY by default, or PNG); disk writes happen on
+    a background thread. Allure attachments reuse the same bytes but stay on the caller's thread,
+    since Allure's lifecycle is bound to the test thread. Each capture is attached to a reporter once.
+    """
+
+    DEFAULT_DIR = PROJECT_ROOT / "screenshots"
+    DEFAULT_TYPE = "jpeg"
+    DEFAULT_QUALITY = 70
+
+    # FNV-1a over the serialized DOM, computed in the page so the DOM itself never crosses the wire
+    PAGE_STATE_HASH_SCRIPT = """
+    () => {
+        const state = location.href + "|" + window.scrollX + "," + window.scrollY + "|" + document.documentElement.outerHTML;
+        let hash = 0x811c9dc5;
+        for (let i = 0; i < state.length; i++) {
+            hash ^= state.charCodeAt(i);
+            hash = Math.imul(hash, 0x01000193);
+        }
+        return (hash >>> 0).toString(16) + ":" + state.length;
+    }
+    """
+
+    def __init__(self, directory=None, image_type=None, quality=None):
+        self.directory = Path(directory or os.getenv("EVIDENCE_DIR") or self.DEFAULT_DIR)
+        self.image_type = (image_type or os.getenv("EVIDENCE_FORMAT", self.DEFAULT_TYPE)).lower()
+        if self.image_type == "jpg":
+            self.image_type = "jpeg"
+        self.quality = quality or int(os.getenv("EVIDENCE_QUALITY", self.DEFAULT_QUALITY))
+
+        self.captured = 0
+        self.deduplicated = 0
+        self._last_by_page = {}  # id(page) -> (state hash, path, image bytes)
+        self._attached = set()  # (id(reporter), path)
+        self._lock = threading.Lock()
+        self._writer = None
+        self._pending = []
+
+    @property
+    def extension(self):
+        return "jpg" if self.image_type == "jpeg" else "png"
+
+    def capture(self, page, module, label, reporter=None):
+        """
+        Captures the page once for `label` and returns the evidence path (the previous one when the page is unchanged).
+        With a reporter, the same bytes are also attached to the report.
+        """
+        try:
+            state = page.evaluate(self.PAGE_STATE_HASH_SCRIPT)
+        except Exception:
+            state = None
+
+        with self._lock:
+            last = self._last_by_page.get(id(page))
+        if state is not None and last is not None and last[0] == state:
+            _, path, body = last
+            with self._lock:
+                self.deduplicated += 1
+            logger.info(f"📸 Page unchanged since the last capture, reusing {path} for '{label}'")
+            self._attach(reporter, body, path)
+            return path
+
+        safe_label = "".join(c if c.isalnum() else "_" for c in str(label))
+        name = f"{module}_{safe_label}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.{self.extension}"
+        path = self.directory / name
+        try:
+            options = {"type": self.image_type}
+            if self.image_type == "jpeg":
+                options["quality"] = self.quality
+            body = page.screenshot(**options)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to take screenshot for '{label}': {e}")
+            return None
+
+        with self._lock:
+            self.captured += 1
+            self._last_by_page[id(page)] = (state, path, body)
+            self._pending.append(self._get_writer().submit(self._write, path, body))
+
+        self._attach(reporter, body, path)
+        logger.info(f"📸 Screenshot captured: {path}")
+        return path
+
+    def _attach(self, reporter, body, path):
+        if reporter is None or allure is None:
+            return
+        with self._lock:
+            if (id(reporter), path) in self._attached:
+                return
+            self._attached.add((id(reporter), path))
+        attachment_type = allure.attachment_type.JPG if self.image_type == "jpeg" else allure.attachment_type.PNG
+        reporter.attach(body, name=path.name, attachment_type=attachment_type)
+
+    def flush(self, timeout=10):
+        with self._lock:
+            pending, self._pending = self._pending, []
+        wait(pending, timeout=timeout)
+
+    def _write(self, path, body):
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(body)
+        except OSError as e:
+            logger.warning(f"⚠️ Failed to save screenshot {path}: {e}")
+
+    def _get_writer(self):
+        # Caller holds self._lock
+        if self._writer is None:
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="evidence-writer")
+        return self._writer
+
+
+_shared_service = None
+_shared_service_lock = threading.Lock()
+
+
+def get_evidence_service():
+    global _shared_service
+    with _shared_service_lock:
+        if _shared_service is None:
+            _shared_service = EvidenceService()
+        return _shared_service
@@ -0,0 +1,149 @@
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger("SystemFlowLogger")
+
+
+class TokenBucket:
+    """
+    Allows `rate` requests per second on average, with bursts of up to `burst` requests.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Takes one token, sleeping until one is available. Returns the seconds waited.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures. While open, requests are refused;
+    after `cooldown` seconds a single probe is let through (half-open): success closes the circuit,
+    failure opens it for another cool-down.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold, cooldown):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record(self, success):
+        """
+        Records a request outcome. Returns the new state when it changed, otherwise None.
+        """
+        with self._lock:
+            previous = self.state
+            if success:
+                self.failures = 0
+                self.state = self.CLOSED
+            else:
+                self.failures += 1
+                if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                    self.state = self.OPEN
+                    self.opened_at = time.monotonic()
+            return self.state if self.state != previous else None
+
+
+class HostGuard:
+    """
+    Per-host token-bucket rate limits and circuit breakers for HTTP link checks.
+    Only connection errors, timeouts and gateway errors count as host failures; a 404 means the host is up.
+    Configured with HOST_RATE_LIMIT (requests/s per host, 0 disables), HOST_BURST,
+    HOST_FAILURE_THRESHOLD and HOST_COOLDOWN (seconds).
+    """
+
+    DEFAULT_RATE = 10
+    DEFAULT_BURST = 20
+    DEFAULT_FAILURE_THRESHOLD = 3
+    DEFAULT_COOLDOWN = 60
+
+    HOST_DOWN_STATUSES = (502, 503, 504)
+
+    def __init__(self, rate=None, burst=None, failure_threshold=None, cooldown=None):
+        self.rate = float(os.getenv("HOST_RATE_LIMIT", self.DEFAULT_RATE)) if rate is None else rate
+        self.burst = burst or int(os.getenv("HOST_BURST", self.DEFAULT_BURST))
+        self.failure_threshold = failure_threshold or int(os.getenv("HOST_FAILURE_THRESHOLD", self.DEFAULT_FAILURE_THRESHOLD))
+        self.cooldown = float(os.getenv("HOST_COOLDOWN", self.DEFAULT_COOLDOWN)) if cooldown is None else cooldown
+
+        self.rejected = {}  # host -> URLs refused while its circuit was open
+        self._buckets = {}
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def admit(self, host):
+        """
+        False while the host's circuit is open: the caller should not send the request.
+        """
+        if self._breaker(host).allow():
+            return True
+        with self._lock:
+            self.rejected[host] = self.rejected.get(host, 0) + 1
+        return False
+
+    def throttle(self, host):
+        """
+        Blocks until the host's rate limit allows another request.
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.rate, self.burst)
+        return bucket.acquire()
+
+    def record(self, host, success):
+        breaker = self._breaker(host)
+        changed = breaker.record(success)
+        if changed == CircuitBreaker.OPEN:
+            logger.warning(f"🔌 {host} failed {breaker.failures} times in a row, its links are marked host unavailable "
+                           f"for {self.cooldown:.0f}s")
+        elif changed == CircuitBreaker.CLOSED:
+            logger.info(f"🔌 {host} is reachable again")
+
+    def state(self, host):
+        return self._breaker(host).state
+
+    def _breaker(self, host):
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = CircuitBreaker(self.failure_threshold, self.cooldown)
+            return breaker
@@ -0,0 +1,175 @@
+import json
+import logging
+import os
+import threading
+import time
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import NamedTuple, Optional
+from urllib.parse import urlsplit
+
+logger = logging.getLogger("SystemFlowLogger")
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+POLICY_PATH = Path(__file__).resolve().parent / "host_policies.json"
+
+
+class HostRule(NamedTuple):
+    strategy: str
+    verify_tls: bool = True
+    timeout: Optional[float] = None  # seconds, overrides the caller's timeout
+    reason: str = ""
+
+
+class HostPolicy:
+    """
+    Per-host link check strategies, loaded from host_policies.json (HOST_POLICY_PATH overrides it).
+    Rules are tried in order; a pattern matches the host itself or any subdomain and may use wildcards.
+    A rule with "run_env" only applies when RUN_ENV has that value.
+
+    Strategies:
+      skip      - no request, the link counts as alive
+      head      - HEAD, then a streamed GET when HEAD fails (the default)
+      head_only - HEAD only
+      get_range - a GET for the first byte only (Range: bytes=0-0)
+      get       - a streamed GET, closed after the headers
+      browser   - checked through the page's browser context (cookies, TLS stack); plain clients fall back to get
+
+    Facts learned about hosts (e.g. "HEAD returns 405") are kept in facts_path, so a "head" host that rejects HEAD
+    goes straight to GET in later runs. Facts expire after HOST_FACTS_TTL seconds (default: 7 days).
+    """
+
+    SKIP = "skip"
+    HEAD = "head"
+    HEAD_ONLY = "head_only"
+    GET_RANGE = "get_range"
+    GET = "get"
+    BROWSER = "browser"
+    STRATEGIES = (SKIP, HEAD, HEAD_ONLY, GET_RANGE, GET, BROWSER)
+
+    # HEAD answers that mean "this server does not do HEAD", not "this link is broken"
+    HEAD_REJECTED_STATUSES = (403, 405, 501)
+
+    DEFAULT_FACTS_PATH = PROJECT_ROOT / ".cache" / "host_facts.json"
+    FACTS_TTL = 7 * 24 * 60 * 60
+
+    def __init__(self, config=None, facts_path=None, run_env=None):
+        if config is None:
+            with open(os.getenv("HOST_POLICY_PATH") or POLICY_PATH, encoding="utf-8") as f:
+                config = json.load(f)
+        self.run_env = (os.getenv("RUN_ENV", "") if run_env is None else run_env).strip().lower()
+        self.default = self._parse_rule(config.get("default", {}))
+        self.rules = [
+            (rule["pattern"].lower(), self._parse_rule(rule))
+            for rule in config.get("hosts", [])
+            if not rule.get("run_env") or rule["run_env"].lower() == self.run_env
+        ]
+        self.facts_path = Path(facts_path) if facts_path else None
+        self.facts_ttl = int(os.getenv("HOST_FACTS_TTL", self.FACTS_TTL))
+
+        self._rule_by_host = {}
+        self._facts = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def _parse_rule(cls, rule):
+        strategy = rule.get("strategy", cls.HEAD)
+        if strategy not in cls.STRATEGIES:
+            raise ValueError(f"Unknown link check strategy '{strategy}', expected one of {cls.STRATEGIES}")
+        return HostRule(strategy, rule.get("verify_tls", True), rule.get("timeout"), rule.get("reason", ""))
+
+    def rule_for(self, url):
+        host = (urlsplit(str(url)).hostname or "").lower()
+        with self._lock:
+            rule = self._rule_by_host.get(host)
+            if rule is None:
+                rule = self._rule_by_host[host] = next(
+                    (rule for pattern, rule in self.rules if self._host_matches(host, pattern)), self.default
+                )
+            return rule
+
+    @staticmethod
+    def _host_matches(host, pattern):
+        return host == pattern or host.endswith("." + pattern) or fnmatch(host, pattern)
+
+    def strategy_for(self, host, rule):
+        """
+        The cheapest method known to work for this host under its rule.
+        """
+        if rule.strategy == self.HEAD and self.fact(host, "head_rejected") is not None:
+            return self.GET
+        return rule.strategy
+
+    def fact(self, host, name):
+        with self._lock:
+            entry = self._load().get(host, {}).get(name)
+        if entry and time.time() - entry["learned_at"] < self.facts_ttl:
+            return entry["value"]
+        return None
+
+    def learn(self, host, name, value):
+        with self._lock:
+            facts = self._load().setdefault(host, {})
+            if facts.get(name, {}).get("value") == value:
+                return
+            facts[name] = {"value": value, "learned_at": time.time()}
+            self._dirty = True
+        logger.info(f"🧠 Learned about {host}: {name} = {value}")
+
+    def save(self):
+        """
+        Merges the learned facts with the file on disk (newest wins) and writes it atomically.
+        """
+        if self.facts_path is None:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            merged = self._read_file()
+            for host, facts in self._facts.items():
+                stored = merged.setdefault(host, {})
+                for name, entry in facts.items():
+                    if name not in stored or stored[name]["learned_at"] <= entry["learned_at"]:
+                        stored[name] = entry
+            try:
+                self.facts_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.facts_path.with_suffix(f".{os.getpid()}.tmp")
+                tmp_path.write_text(json.dumps(merged, ensure_ascii=False, indent=1), encoding="utf-8")
+                os.replace(tmp_path, self.facts_path)
+                self._facts = merged
+                self._dirty = False
+            except OSError as e:
+                logger.warning(f"⚠️ Failed to save host facts to {self.facts_path}: {e}")
+
+    def _load(self):
+        # Caller holds self._lock
+        if self._facts is None:
+            self._facts = self._read_file()
+        return self._facts
+
+    def _read_file(self):
+        if self.facts_path is None:
+            return {}
+        try:
+            return json.loads(self.facts_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Ignoring unreadable host facts {self.facts_path}: {e}")
+            return {}
+
+
+_shared_policy = None
+_shared_policy_lock = threading.Lock()
+
+
+def get_host_policy():
+    """
+    Returns the process-wide host policy, persisting learned facts to .cache/host_facts.json (HOST_FACTS_PATH).
+    """
+    global _shared_policy
+    with _shared_policy_lock:
+        if _shared_policy is None:
+            _shared_policy = HostPolicy(facts_path=os.getenv("HOST_FACTS_PATH") or HostPolicy.DEFAULT_FACTS_PATH)
+        return _shared_policy
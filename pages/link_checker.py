@@ -0,0 +1,344 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple, Union
+from urllib.parse import unquote, urlsplit
+
+from .host_guard import HostGuard
+from .host_policy import HostPolicy, get_host_policy
+from .tracing import get_tracer
+from .url_status_cache import get_url_status_cache
+
+logger = logging.getLogger("SystemFlowLogger")
+
+
+class LinkCheckResult(NamedTuple):
+    url: str
+    ok: bool
+    status: Union[int, str]  # HTTP status code, or the error text when the request failed
+    strategy: str = ""      # how it was decided: "head", "get", "get_range", "document", "cache", "skip"...
+    latency: float = 0.0    # seconds
+
+
+# Document extension -> (expected content types, magic bytes at the start of the file)
+DOCUMENT_SIGNATURES = {
+    ".pdf": (("application/pdf",), (b"%PDF",)),
+    ".doc": (("application/msword",), (b"\xd0\xcf\x11\xe0",)),
+    ".xls": (("application/vnd.ms-excel",), (b"\xd0\xcf\x11\xe0",)),
+    ".docx": (("application/vnd.openxmlformats",), (b"PK\x03\x04",)),
+    ".xlsx": (("application/vnd.openxmlformats",), (b"PK\x03\x04",)),
+}
+# Content types that say nothing about the file, so only the magic bytes decide
+GENERIC_CONTENT_TYPES = ("", "application/octet-stream", "binary/octet-stream", "application/force-download",
+                         "application/download")
+
+
+def document_type(url):
+    """
+    The document extension of a URL (".pdf", ...), or None when it does not look like a document.
+    """
+    path = unquote(urlsplit(str(url)).path).strip().lower()
+    extension = path[path.rfind("."):] if "." in path.rsplit("/", 1)[-1] else ""
+    return extension if extension in DOCUMENT_SIGNATURES else None
+
+
+class HostUnavailable(Exception):
+    """ Raised instead of requesting a URL whose host's circuit is open. """
+
+
+class LinkChecker:
+    """
+    Shared HTTP link-liveness engine.
+    Keeps one pooled keep-alive session and checks batches of URLs concurrently,
+    with at most `max_per_host` requests in flight to any one host.
+    Each host is also rate limited and guarded by a circuit breaker (see HostGuard): once a host keeps failing,
+    its remaining URLs are reported as HOST_UNAVAILABLE without a request until a probe after the cool-down succeeds.
+    Document links (PDF, Word, Excel) are probed with a ranged, streamed GET that reads only the first
+    `document_bytes` (LINK_CHECK_DOCUMENT_BYTES, default 4 KB), checks the content type and magic bytes, and closes.
+    How each host is checked (skip, HEAD, ranged GET, TLS verification, timeout) comes from its HostPolicy rule.
+    Results go through the shared URL status cache, so repeated targets are fetched once.
+    In offline mode (HAR replay, LINK_CHECK_OFFLINE=1) nothing is requested: answers come from the cache
+    regardless of age, and unknown URLs are reported as SKIPPED_OFFLINE.
+    """
+
+    USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+    DEFAULT_TIMEOUT = 5  # seconds
+    DEFAULT_WORKERS = 8
+    DEFAULT_PER_HOST = 4
+
+    OFFLINE_STATUS = "SKIPPED_OFFLINE"
+    SKIPPED_STATUS = "SKIPPED_POLICY"
+    INVALID_DOCUMENT_STATUS = "INVALID_DOCUMENT"
+    DOCUMENT_PROBE_BYTES = 4096
+    HOST_UNAVAILABLE_STATUS = "HOST_UNAVAILABLE"
+
+    def __init__(self, max_workers=None, timeout=None, cache=None, offline=None, max_per_host=None, host_guard=None, host_policy=None):
+        self.cache = cache
+        self.host_guard = host_guard or HostGuard()
+        self.host_policy = host_policy or HostPolicy()
+        self.offline = os.getenv("LINK_CHECK_OFFLINE") == "1" if offline is None else offline
+        self.max_workers = max_workers or int(os.getenv("LINK_CHECK_WORKERS", self.DEFAULT_WORKERS))
+        self.max_per_host = max_per_host or int(os.getenv("LINK_CHECK_PER_HOST", self.DEFAULT_PER_HOST))
+        self.timeout = timeout or self.DEFAULT_TIMEOUT
+        self.document_bytes = int(os.getenv("LINK_CHECK_DOCUMENT_BYTES", self.DOCUMENT_PROBE_BYTES))
+        self.transfer = {"requests": 0, "documents": 0, "bytes_read": 0, "document_bytes": 0}
+        self._transfer_lock = threading.Lock()
+
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._host_slots = {}
+        self._host_slots_lock = threading.Lock()
+
+    @property
+    def session(self):
+        """
+        The pooled HTTP session, created on the first request: importing requests is most of the suite's
+        import time, and collection or offline runs never need it.
+        """
+        with self._session_lock:
+            if self._session is None:
+                import requests
+                import urllib3
+                from requests.adapters import HTTPAdapter
+
+                # Hosts with verify_tls off (and the water page's unverified checks) would warn on every request
+                urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+                session = requests.Session()
+                session.headers.update({'User-Agent': self.USER_AGENT})
+                adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._session = session
+            return self._session
+
+    def check(self, url, verify=True, timeout=None, use_cache=True, parent_span=None):
+        """
+        Checks a single URL, answering from the status cache when a fresh entry exists.
+        With `use_cache=False` the URL is always requested, and the cache is refreshed with the answer.
+        `parent_span` nests the check's timing span when it runs on a worker thread.
+        """
+        started = time.monotonic()
+        with get_tracer().span("http_check", parent=parent_span, url=url) as span:
+            result, from_cache = self._check(url, verify, timeout, use_cache)
+            if span is not None:
+                span.attributes.update(status=result.status, from_cache=from_cache, strategy=result.strategy)
+            return result._replace(latency=time.monotonic() - started)
+
+    def _check(self, url, verify, timeout, use_cache):
+        rule = self.host_policy.rule_for(url)
+        if rule.strategy == HostPolicy.SKIP:
+            logger.info(f"⏭️ Skipping HTTP check by host policy ({rule.reason or 'skip'}): {url}")
+            return LinkCheckResult(url, True, self.SKIPPED_STATUS, "skip"), False
+
+        # The host policy can only turn certificate checks off; the cache is keyed by the effective setting
+        verify = verify and rule.verify_tls
+        if self.offline:
+            return self._offline_result(url, verify), True
+
+        try:
+            if self.cache is None:
+                return self._fetch(url, rule, verify, timeout), False
+            if not use_cache:
+                result = self._fetch(url, rule, verify, timeout)
+                self.cache.put(url, result.ok, result.status, verify)
+                return result, False
+
+            fetched = []
+
+            def fetch():
+                fetched.append(self._fetch(url, rule, verify, timeout))
+                return fetched[0].ok, fetched[0].status
+
+            # HostUnavailable propagates out of get_or_fetch, so the refusal is never cached
+            ok, status, from_cache = self.cache.get_or_fetch(url, fetch, verify)
+        except HostUnavailable:
+            return LinkCheckResult(url, False, self.HOST_UNAVAILABLE_STATUS, "circuit_open"), False
+
+        if fetched:
+            return fetched[0], False
+        logger.debug(f"Cached status for {url}: {status}")
+        return LinkCheckResult(url, ok, status, "cache"), from_cache
+
+    def _offline_result(self, url, verify):
+        entry = self.cache.get(url, ignore_ttl=True, verify=verify) if self.cache is not None else None
+        if entry:
+            return LinkCheckResult(url, entry["ok"], entry["status"], "cache")
+        return LinkCheckResult(url, True, self.OFFLINE_STATUS, "offline")
+
+    def _fetch(self, url, rule, verify, timeout):
+        """
+        Requests the URL with the cheapest method its host policy allows (HEAD, then a streamed GET, by default).
+        Raises HostUnavailable when the host's circuit is open.
+        """
+        import requests
+
+        host = _host_of(url)
+        if not self.host_guard.admit(host):
+            raise HostUnavailable(host)
+
+        verify = verify and rule.verify_tls
+        timeout = rule.timeout or timeout or self.timeout
+        strategy = self.host_policy.strategy_for(host, rule)
+        if document_type(url) and strategy != HostPolicy.HEAD_ONLY:
+            strategy = "document"
+        try:
+            with self._host_slot(host):
+                status, strategy = self._request(host, url, strategy, verify, timeout)
+
+            self.host_guard.record(host, success=status not in HostGuard.HOST_DOWN_STATUSES)
+            return LinkCheckResult(url, status in (200, 206), status, strategy)
+
+        except (requests.ConnectionError, requests.Timeout) as e:
+            self.host_guard.record(host, success=False)
+            return LinkCheckResult(url, False, str(e), strategy)
+        except Exception as e:
+            # Redirect loops, invalid URLs...: the URL is broken, not the host
+            self.host_guard.record(host, success=True)
+            return LinkCheckResult(url, False, str(e), strategy)
+
+    def _request(self, host, url, strategy, verify, timeout):
+        """
+        Returns (status, strategy that decided it).
+        """
+        if strategy == "document":
+            return self._probe_document(host, url, document_type(url), verify, timeout), strategy
+
+        if strategy in (HostPolicy.HEAD, HostPolicy.HEAD_ONLY):
+            head_status = self._send("HEAD", host, url, verify, timeout)
+            if strategy == HostPolicy.HEAD_ONLY or head_status < 400:
+                return head_status, HostPolicy.HEAD
+            status = self._send("GET", host, url, verify, timeout)
+            if head_status in HostPolicy.HEAD_REJECTED_STATUSES and status < 400:
+                self.host_policy.learn(host, "head_rejected", head_status)
+            return status, HostPolicy.GET
+
+        if strategy == HostPolicy.GET_RANGE:
+            return self._send("GET", host, url, verify, timeout, {"Range": "bytes=0-0"}), strategy
+        return self._send("GET", host, url, verify, timeout), HostPolicy.GET
+
+    def _send(self, method, host, url, verify, timeout, headers=None):
+        # Streamed, so a GET is closed right after the headers and never downloads the body
+        self.host_guard.throttle(host)
+        with self.session.request(method, url, headers=headers, allow_redirects=True, timeout=timeout,
+                                  stream=True, verify=verify) as response:
+            self._record_transfer(0)
+            return response.status_code
+
+    def _probe_document(self, host, url, extension, verify, timeout):
+        """
+        Reads the first bytes of a document and closes the connection, whether or not the server honored the Range.
+        Returns the HTTP status, or an INVALID_DOCUMENT status when the response is not the expected kind of file.
+        """
+        self.host_guard.throttle(host)
+        with self.session.get(url, headers={"Range": f"bytes=0-{self.document_bytes - 1}"}, allow_redirects=True,
+                              timeout=timeout, stream=True, verify=verify) as response:
+            status = response.status_code
+            content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+            head = response.raw.read(self.document_bytes, decode_content=True) if status in (200, 206) else b""
+            self._record_transfer(len(head), _document_size(response), document=True)
+
+        if status not in (200, 206):
+            return status
+        content_types, signatures = DOCUMENT_SIGNATURES[extension]
+        if content_type not in GENERIC_CONTENT_TYPES and not content_type.startswith(content_types):
+            return f"{self.INVALID_DOCUMENT_STATUS}: served {content_type} instead of {extension}"
+        # PDF readers accept the header anywhere in the first KB
+        if not any(signature in head[:1024] for signature in signatures):
+            return f"{self.INVALID_DOCUMENT_STATUS}: no {extension} signature in the first bytes"
+        return status
+
+    def _record_transfer(self, bytes_read, document_size=None, document=False):
+        with self._transfer_lock:
+            self.transfer["requests"] += 1
+            self.transfer["bytes_read"] += bytes_read
+            if document:
+                self.transfer["documents"] += 1
+                self.transfer["document_bytes"] += document_size or bytes_read
+
+    def format_transfer(self):
+        with self._transfer_lock:
+            transfer = dict(self.transfer)
+        line = f"Link checks: {transfer['requests']} requests, {_format_bytes(transfer['bytes_read'])} of response bodies read"
+        if transfer["documents"]:
+            saved = 1 - transfer["bytes_read"] / transfer["document_bytes"] if transfer["document_bytes"] else 0
+            line += (f"\nDocuments: {transfer['documents']} probed, {_format_bytes(transfer['bytes_read'])} read "
+                     f"of {_format_bytes(transfer['document_bytes'])} ({saved:.1%} not downloaded)")
+        return line
+
+    def _host_slot(self, host):
+        with self._host_slots_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.max_per_host)
+            return slot
+
+    def check_many(self, urls, verify=True, timeout=None, use_cache=True):
+        """
+        Checks a batch of URLs concurrently. Returns a dict of url -> LinkCheckResult.
+        Duplicate URLs in the batch are only requested once.
+        """
+        unique_urls = list(dict.fromkeys(urls))
+        if not unique_urls:
+            return {}
+
+        with get_tracer().span("http_batch", urls=len(unique_urls)) as batch_span:
+            executor = self._get_executor()
+            results = executor.map(
+                lambda u: self.check(u, verify=verify, timeout=timeout, use_cache=use_cache, parent_span=batch_span),
+                unique_urls,
+            )
+            return {result.url: result for result in results}
+
+    def _get_executor(self):
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="link-check")
+            return self._executor
+
+    def close(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+        if self._session is not None:
+            self._session.close()
+
+
+def _document_size(response):
+    """ Full size of the file behind a (possibly ranged) response, when the server says. """
+    content_range = response.headers.get("Content-Range", "")
+    total = content_range.rsplit("/", 1)[-1] if "/" in content_range else None
+    if total is None and response.status_code == 200:
+        total = response.headers.get("Content-Length")
+    return int(total) if total and total.isdigit() else None
+
+
+def _format_bytes(size):
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def _host_of(url):
+    return (urlsplit(url).hostname or "").lower()
+
+
+_shared_checker = None
+_shared_checker_lock = threading.Lock()
+
+
+def get_link_checker():
+    """
+    Returns the process-wide LinkChecker shared by all page objects.
+    """
+    global _shared_checker
+    with _shared_checker_lock:
+        if _shared_checker is None:
+            _shared_checker = LinkChecker(cache=get_url_status_cache(), host_policy=get_host_policy())
+        return _shared_checker
@@ -0,0 +1,136 @@
+import json
+import os
+import re
+from collections import deque
+from functools import lru_cache
+from pathlib import Path
+
+MANIFEST_PATH = Path(__file__).resolve().parent / "link_manifest.json"
+
+# Niqqud/cantillation marks (keeping maqaf, paseq and sof pasuq), bidi controls and zero-width characters
+_IGNORED_CHARS = re.compile("[\u0591-\u05BD\u05BF\u05C1\u05C2\u05C4\u05C5\u05C7\u061C\u200B-\u200F\u202A-\u202E\u2066-\u2069\uFEFF]")
+_WHITESPACE = re.compile(r"\s+")
+_HEBREW_PUNCTUATION = str.maketrans({"\u05F4": '"', "\u05F3": "'"})
+
+
+def normalize_text(text):
+    """
+    Normalizes Hebrew link text for matching: drops niqqud and RTL/LTR marks,
+    maps geresh/gershayim to plain quotes and collapses whitespace.
+    """
+    text = _IGNORED_CHARS.sub("", text or "").translate(_HEBREW_PUNCTUATION)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+class TextMatcher:
+    """
+    Aho–Corasick automaton over a fixed set of link texts.
+    Finds every pattern contained in a text in one pass, however many patterns there are.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = list(dict.fromkeys(patterns))
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+
+        for index, pattern in enumerate(self.patterns):
+            normalized = normalize_text(pattern)
+            if not normalized:
+                continue
+            node = 0
+            for char in normalized:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = next_node
+            self._out[node].append(index)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, next_node in self._goto[node].items():
+                queue.append(next_node)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_node] = self._goto[fail].get(char, 0)
+                self._out[next_node] = self._out[next_node] + self._out[self._fail[next_node]]
+
+    def search(self, text):
+        """
+        Returns the set of patterns contained in `text`.
+        """
+        node = 0
+        found = set()
+        for char in normalize_text(text):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            found.update(self._out[node])
+        return {self.patterns[index] for index in found}
+
+    def match(self, texts):
+        """
+        Matches all patterns against a list of texts.
+        Returns {pattern: [indexes of the texts that contain it, in order]}.
+        """
+        matches = {pattern: [] for pattern in self.patterns}
+        for position, text in enumerate(texts):
+            for pattern in self.search(text):
+                matches[pattern].append(position)
+        return matches
+
+
+@lru_cache(maxsize=None)
+def _compile_matcher(patterns):
+    return TextMatcher(patterns)
+
+
+def get_text_matcher(patterns):
+    """
+    Returns a compiled matcher for the given link texts, compiling each distinct set only once.
+    """
+    return _compile_matcher(tuple(patterns))
+
+
+class LinkManifest:
+    """
+    Declarative link expectations: module -> tab -> link text -> expected URL fragment.
+    """
+
+    def __init__(self, data):
+        self._data = data
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def modules(self):
+        return list(self._data)
+
+    def tabs(self, module):
+        return list(self._data.get(module, {}))
+
+    def links(self, module, tab):
+        """
+        Returns a copy of the {link_text: expected_url_part} dictionary for one tab.
+        """
+        return dict(self._data.get(module, {}).get(tab, {}))
+
+    def matcher(self, module, tab):
+        return get_text_matcher(self._data.get(module, {}).get(tab, {}))
+
+
+@lru_cache(maxsize=None)
+def load_link_manifest():
+    """
+    Loads the link manifest once per process. LINK_MANIFEST_PATH overrides the bundled file.
+    """
+    return LinkManifest.from_file(os.getenv("LINK_MANIFEST_PATH") or MANIFEST_PATH)
+
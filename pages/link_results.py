@@ -0,0 +1,183 @@
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Union
+
+from .link_checker import LinkChecker
+
+logger = logging.getLogger("SystemFlowLogger")
+
+# Strategies of link verifications on the page; every other strategy is an HTTP check
+VERIFY_STRATEGIES = ("attributes", "popup_intercept", "popup_load")
+
+
+@dataclass
+class LinkResult:
+    """
+    One link check. `strategy` says how it was decided: "attributes"/"popup_*" for verifications on the page,
+    or the HTTP method ("head", "get", "get_range", "document", "browser", "cache", "skip", ...) for status checks.
+    `verify` and `timeout` are the options an HTTP check was requested with, so a retry checks the same way.
+    """
+
+    __slots__ = ("module", "tab", "link_text", "url", "status", "ok", "strategy", "latency", "attempts",
+                 "verify", "timeout")
+
+    module: str
+    tab: Optional[str]
+    link_text: Optional[str]
+    url: Optional[str]
+    status: Union[int, str]
+    ok: bool
+    strategy: str
+    latency: float  # seconds
+    attempts: int
+    verify: bool
+    timeout: Optional[float]  # seconds, None for the checker's default
+
+    @property
+    def is_http_check(self):
+        return self.strategy not in VERIFY_STRATEGIES
+
+    @property
+    def is_unreachable(self):
+        """
+        An HTTP check that got no usable answer (request error, host unavailable): says nothing about the link itself.
+        A document that came back as something else is a real answer, so it is not unreachable.
+        """
+        return (self.is_http_check and isinstance(self.status, str)
+                and not self.status.startswith(LinkChecker.INVALID_DOCUMENT_STATUS))
+
+    @property
+    def is_flaky(self):
+        """ Passed, but only after a retry. """
+        return self.ok and self.attempts > 1
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class LinkResultStore:
+    """
+    Run-scoped store of LinkResult records, shared by all page objects and threads.
+    Records are indexed by module, tab, URL and outcome in sets, so queries and duplicate checks do not scan the run.
+    The same check (module, tab, link, URL, status, strategy) recorded twice is kept once.
+    Retries update their record in place (see update()).
+    """
+
+    INDEXED_FIELDS = ("module", "tab", "url", "ok")
+
+    def __init__(self):
+        self._records = []
+        self._positions = {}  # id(record) -> position
+        self._keys = set()
+        self._index = {field: {} for field in self.INDEXED_FIELDS}  # field -> value -> set of record positions
+        self._lock = threading.Lock()
+
+    def record(self, module, tab, link_text, url, status, ok, strategy, latency=0.0, attempts=1, verify=True, timeout=None):
+        result = LinkResult(module, tab, link_text, url, status, ok, strategy, latency, attempts, verify, timeout)
+        key = (module, tab, link_text, url, str(status), strategy)
+        with self._lock:
+            if key in self._keys:
+                return None
+            self._keys.add(key)
+            position = len(self._records)
+            self._records.append(result)
+            self._positions[id(result)] = position
+            for field in self.INDEXED_FIELDS:
+                self._index[field].setdefault(getattr(result, field), set()).add(position)
+        return result
+
+    def update(self, result, **changes):
+        """
+        Changes fields of a stored record (e.g. a retry's outcome), keeping the indexes in step.
+        """
+        with self._lock:
+            position = self._positions[id(result)]
+            for field, value in changes.items():
+                if field in self._index:
+                    self._index[field][getattr(result, field)].discard(position)
+                    self._index[field].setdefault(value, set()).add(position)
+                setattr(result, field, value)
+        return result
+
+    def flaky(self):
+        return [result for result in self.query(ok=True) if result.is_flaky]
+
+    def query(self, **criteria):
+        """
+        Records matching every given field, e.g. query(module="water", ok=False), in recording order.
+        """
+        with self._lock:
+            positions = None
+            for field, value in criteria.items():
+                if field not in self._index:
+                    raise ValueError(f"Cannot query by '{field}', indexed fields are {self.INDEXED_FIELDS}")
+                matches = self._index[field].get(value, set())
+                positions = matches if positions is None else positions & matches
+            if positions is None:
+                return list(self._records)
+            return [self._records[position] for position in sorted(positions)]
+
+    def failed_http_checks(self, module=None):
+        criteria = {"ok": False} if module is None else {"ok": False, "module": module}
+        return [result for result in self.query(**criteria) if result.is_http_check]
+
+    def broken(self, module=None):
+        """
+        Failed HTTP checks the server answered (an error status, or no document where one was expected):
+        links that are dead, not just misplaced on the page.
+        """
+        return [result for result in self.failed_http_checks(module) if not result.is_unreachable]
+
+    def unreachable(self, module=None):
+        """
+        Failed HTTP checks without an answer (request errors, host unavailable). Reported, but not counted as broken.
+        """
+        return [result for result in self.failed_http_checks(module) if result.is_unreachable]
+
+    def failed_verifications(self, module=None):
+        criteria = {"ok": False} if module is None else {"ok": False, "module": module}
+        return [result for result in self.query(**criteria) if not result.is_http_check]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._records)
+
+    def export_jsonl(self, path):
+        """
+        Writes one JSON record per line. Returns the path, or None when nothing was recorded.
+        """
+        with self._lock:
+            records = list(self._records)
+        if not records:
+            return None
+        path = Path(path)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                for result in records:
+                    f.write(json.dumps(result.to_dict(), ensure_ascii=False) + "\n")
+        except OSError as e:
+            logger.warning(f"⚠️ Failed to export link results to {path}: {e}")
+            return None
+        return path
+
+
+def read_jsonl(path):
+    """
+    Streams the LinkResult records of an exported run.
+    """
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                # Exports written before verify/timeout were recorded used the checker's defaults
+                yield LinkResult(**{"verify": True, "timeout": None, **json.loads(line)})
+
+
+_shared_store = LinkResultStore()
+
+
+def get_link_result_store():
+    return _shared_store
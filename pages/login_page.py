@@ -8,6 +8,11 @@ logger = logging.getLogger("SystemFlowLogger")
 class LoginPage(BasePage):
     """Class representing the Login page, supporting password login and login within a modal."""
 
+    MODULE_NAME = "login"
+
+    # The login form loads its own third-party scripts (captcha): only heavy media is blocked
+    BLOCKING_PROFILE = {"resource_types": ["image", "media", "font"], "deny_hosts": [], "allow_hosts": ["google.com", "gstatic.com"]}
+
     PASSWORD_TAB_TEXT = "באמצעות סיסמה"
     # Using text selector for the button
     PASSWORD_TAB_SELECTOR = f"button:has-text('{PASSWORD_TAB_TEXT}')"
@@ -77,7 +82,7 @@ class LoginPage(BasePage):
             if password_tab.is_visible(timeout=5000):
                 password_tab.click()
                 logger.info(">>> Clicked 'באמצעות סיסמה' tab inside modal")
-                self.page.wait_for_timeout(1000)
+                self.wait_until_visible(target.locator("//input[@name='password']").first, timeout=5000)
         except Exception:
             logger.info(">>> 'באמצעות סיסמה' tab not found or already active, continuing...")
 
@@ -0,0 +1,85 @@
+import os
+import threading
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+# Resource types and third-party hosts the link checks never need.
+# Stylesheets stay allowed: visibility checks depend on layout.
+DEFAULT_BLOCKING_PROFILE = {
+    "resource_types": ["image", "media", "font"],
+    "deny_hosts": [
+        "google-analytics.com", "googletagmanager.com", "doubleclick.net", "googlesyndication.com",
+        "facebook.net", "facebook.com", "connect.facebook.net", "hotjar.com", "clarity.ms",
+        "youtube.com", "ytimg.com", "twitter.com", "linkedin.com",
+    ],
+    "allow_hosts": [],
+}
+
+
+def blocking_mode():
+    """
+    BLOCK_RESOURCES=on (default) aborts matching requests, "audit" lets them through but measures
+    what blocking would save, "off" disables the profile.
+    """
+    mode = os.getenv("BLOCK_RESOURCES", "on").strip().lower()
+    return mode if mode in ("on", "audit", "off") else "on"
+
+
+def _host_matches(host, patterns):
+    return any(host == p or host.endswith("." + p) for p in patterns)
+
+
+def should_block(url, resource_type, profile):
+    """
+    allow_hosts always wins; otherwise a request is blocked by its resource type or a denied host.
+    """
+    if not profile:
+        return False
+    host = (urlsplit(url).hostname or "").lower()
+    if _host_matches(host, profile.get("allow_hosts", [])):
+        return False
+    return resource_type in profile.get("resource_types", []) or _host_matches(host, profile.get("deny_hosts", []))
+
+
+class BlockingStats:
+    """
+    Per-module count of requests avoided by the blocking profile, and the bytes they would have cost
+    (bytes are only known in audit mode, where the requests are allowed through and measured).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._requests = defaultdict(lambda: defaultdict(int))
+        self._bytes = defaultdict(int)
+
+    def record_request(self, module, resource_type):
+        with self._lock:
+            self._requests[module][resource_type] += 1
+
+    def record_bytes(self, module, size):
+        with self._lock:
+            self._bytes[module] += size
+
+    def summary(self):
+        """
+        Returns {module: {"requests": {resource_type: count}, "bytes": int}}.
+        """
+        with self._lock:
+            return {
+                module: {"requests": dict(self._requests[module]), "bytes": self._bytes.get(module, 0)}
+                for module in self._requests
+            }
+
+    def format_table(self):
+        rows = [f"{'Module':<14}{'Requests':>10}{'Bytes (audit)':>16}  By type"]
+        for module, data in sorted(self.summary().items()):
+            by_type = ", ".join(f"{t}={n}" for t, n in sorted(data["requests"].items()))
+            rows.append(f"{module:<14}{sum(data['requests'].values()):>10}{data['bytes']:>16}  {by_type}")
+        return "\n".join(rows)
+
+
+_shared_stats = BlockingStats()
+
+
+def get_blocking_stats():
+    return _shared_stats
@@ -0,0 +1,139 @@
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .link_checker import get_link_checker
+from .link_results import get_link_result_store
+from .tab_state import get_tab_state_store
+from .tracing import get_tracer
+
+logger = logging.getLogger("SystemFlowLogger")
+
+
+class RetryPolicy:
+    """
+    How failed link checks are retried: `attempts` in total (the main pass included), waiting an exponentially
+    growing delay with jitter between attempts. Configured with LINK_RETRY_ATTEMPTS (default 3),
+    LINK_RETRY_BASE_DELAY and LINK_RETRY_MAX_DELAY (seconds).
+    """
+
+    DEFAULT_ATTEMPTS = 3
+    DEFAULT_BASE_DELAY = 1.0
+    DEFAULT_MAX_DELAY = 10.0
+
+    def __init__(self, attempts=None, base_delay=None, max_delay=None):
+        self.attempts = attempts or int(os.getenv("LINK_RETRY_ATTEMPTS", self.DEFAULT_ATTEMPTS))
+        self.base_delay = float(os.getenv("LINK_RETRY_BASE_DELAY", self.DEFAULT_BASE_DELAY)) if base_delay is None else base_delay
+        self.max_delay = float(os.getenv("LINK_RETRY_MAX_DELAY", self.DEFAULT_MAX_DELAY)) if max_delay is None else max_delay
+
+    def delays(self):
+        """
+        The wait before each retry: half of the capped exponential delay, plus a random share of the other half,
+        so retries of many links do not hit a recovering host at the same moment.
+        """
+        for retry in range(self.attempts - 1):
+            delay = min(self.max_delay, self.base_delay * 2 ** retry)
+            yield delay / 2 + random.uniform(0, delay / 2)
+
+
+def retry_failed_http_checks(store=None, checker=None, policy=None):
+    """
+    Retry phase for HTTP checks that failed during the run, started once all modules are done.
+    Each failing URL is retried concurrently with the others (the checker's per-host limits still apply),
+    bypassing the status cache, with the TLS verification and timeout of its first check.
+    A URL that recovers updates all its records to OK with their attempt count,
+    which marks them flaky; a URL that fails every attempt stays broken.
+    Returns the records that recovered.
+    """
+    store = get_link_result_store() if store is None else store
+    checker = get_link_checker() if checker is None else checker
+    policy = RetryPolicy() if policy is None else policy
+
+    records_by_check = {}  # (url, verify, timeout) -> records
+    for record in store.failed_http_checks():
+        if record.url:
+            records_by_check.setdefault((record.url, record.verify, record.timeout), []).append(record)
+    # Offline runs answer from the cache, so a retry could not change anything
+    if not records_by_check or policy.attempts < 2 or checker.offline:
+        return []
+
+    logger.info(f"🔁 Retrying {len(records_by_check)} failed links (up to {policy.attempts - 1} more attempts each)")
+    recovered = []
+    recovered_lock = threading.Lock()
+
+    def retry(key, parent_span):
+        url, verify, timeout = key
+        for attempt, delay in enumerate(policy.delays(), start=2):
+            time.sleep(delay)
+            # Refreshes the status cache entry of the first check
+            result = checker.check(url, verify=verify, timeout=timeout, use_cache=False, parent_span=parent_span)
+            for record in records_by_check[key]:
+                store.update(record, ok=result.ok, status=result.status, strategy=result.strategy,
+                             latency=result.latency, attempts=attempt)
+            if result.ok:
+                logger.info(f"🔁 {url} recovered on attempt {attempt}, reported as flaky")
+                with recovered_lock:
+                    recovered.extend(records_by_check[key])
+                return
+        logger.warning(f"❌ {url} failed all {policy.attempts} attempts: {records_by_check[key][0].status}")
+
+    with get_tracer().span("retry_phase", urls=len(records_by_check)) as span:
+        with ThreadPoolExecutor(max_workers=checker.max_workers, thread_name_prefix="link-retry") as executor:
+            for future in [executor.submit(retry, key, span) for key in records_by_check]:
+                future.result()
+    return recovered
+
+
+def retry_failed_popups(module, open_tab, store=None, policy=None):
+    """
+    Per-module retry phase for popup verifications that failed during the module's main pass.
+    Popups need the browser, so each round reopens the tabs that still have failing links
+    (`open_tab(tab)` returns the module's page object on that tab, or None if the tab cannot be reached again)
+    and verifies those links there. Navigation counts towards the backoff delay; only what is left of it is slept,
+    through the page object's accounted sleep(). A link that recovers is reported as flaky.
+    Returns the records that recovered.
+    """
+    store = get_link_result_store() if store is None else store
+    policy = RetryPolicy() if policy is None else policy
+
+    failing = {}
+    for record in store.failed_verifications(module):
+        if record.strategy.startswith("popup"):
+            failing.setdefault(record.tab, []).append(record)
+    if not failing or policy.attempts < 2:
+        return []
+
+    logger.info(f"🔁 Retrying {sum(map(len, failing.values()))} failed popups of {module} "
+                f"(up to {policy.attempts - 1} more attempts each)")
+    recovered, retried_tabs = [], set(failing)
+    with get_tracer().span("popup_retry_phase", module=module):
+        for attempt, delay in enumerate(policy.delays(), start=2):
+            if not failing:
+                break
+            ready_at = time.monotonic() + delay
+            for tab, records in list(failing.items()):
+                page_object = open_tab(tab)
+                if page_object is None:
+                    logger.warning(f"⚠️ {module}/{tab} cannot be reopened, its failed popups are not retried")
+                    del failing[tab]
+                    continue
+                remaining = ready_at - time.monotonic()
+                if remaining > 0:
+                    page_object.sleep(remaining * 1000)
+                for record in page_object.retry_links(records, attempt):
+                    logger.info(f"🔁 '{record.link_text}' recovered on attempt {attempt}, reported as flaky")
+                    recovered.append(record)
+                failing[tab] = [record for record in records if not record.ok]
+                if not failing[tab]:
+                    del failing[tab]
+
+    for records in failing.values():
+        for record in records:
+            logger.warning(f"❌ '{record.link_text}' failed all {record.attempts} popup attempts")
+    # The tabs were remembered as failed at the end of the main pass
+    for tab in retried_tabs:
+        get_tab_state_store().update_outcome(module, tab, not store.query(module=module, tab=tab, ok=False))
+    return recovered
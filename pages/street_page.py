@@ -11,6 +11,11 @@ class StreetPage(BasePage):
     Implements robust validation focusing on Playwright's auto-waiting and locators.
     """
 
+    MODULE_NAME = "street"
+
+    # The street search widget relies on third-party scripts: only heavy media is blocked
+    BLOCKING_PROFILE = {"resource_types": ["image", "media", "font"], "deny_hosts": [], "allow_hosts": []}
+
     TEST_STREET_NAME = "רבי מאיר" 
 
     PAGE_LOAD_VALIDATOR = "text='מידע על רחוב'"
@@ -33,7 +38,7 @@ class StreetPage(BasePage):
     def open_street_page(self):
         """ Navigates to the street info page and waits for the critical text. """
         self.go_to_url(self.STREET_URL)
-        self.page.wait_for_load_state("domcontentloaded")
+        self.wait_for_load_state("domcontentloaded")
         
         try:
             # Wait for any visible occurrence of the text using regex for flexibility
@@ -59,8 +64,6 @@ class StreetPage(BasePage):
         input_element = self.get_element(self.STREET_NAME_INPUT_LOCATOR)
         
         input_element.fill(street_name)
-        
-        time.sleep(0.5) 
 
         STREET_SUGGESTION_LOCATOR = f"xpath=//*[contains(@class, 'suggestion') or @role='option'][contains(normalize-space(.), '{street_name}')]"
         
@@ -0,0 +1,154 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from .url_status_cache import get_url_status_cache
+
+logger = logging.getLogger("SystemFlowLogger")
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+class TabStateStore:
+    """
+    Remembers, per module tab, a hash of the links found for its expected texts (text, href, onclick, visibility)
+    and whether the last verification passed. A tab is unchanged when its hash matches a passing run that is less than
+    TAB_STATE_MAX_AGE seconds old (default: 24 hours) and every target that run checked over HTTP is still fresh and
+    OK in the URL status cache; its verification can then be skipped. Tabs verified only on the page (attributes,
+    popups) have no such targets, so for them the hash and the age decide.
+    `force_full_run` (--full-run / FORCE_FULL_RUN=1) verifies everything but still records new hashes.
+    """
+
+    DEFAULT_PATH = PROJECT_ROOT / ".cache" / "tab_hashes.json"
+    MAX_AGE = 24 * 60 * 60
+
+    def __init__(self, path=None, force_full_run=None, url_cache=None):
+        self.path = Path(path or os.getenv("TAB_STATE_PATH") or self.DEFAULT_PATH)
+        self.force_full_run = os.getenv("FORCE_FULL_RUN") == "1" if force_full_run is None else force_full_run
+        self.url_cache = url_cache or get_url_status_cache()
+        self.max_age = int(os.getenv("TAB_STATE_MAX_AGE", self.MAX_AGE))
+        self.skipped = []  # (module, tab, verified_at)
+
+        self._entries = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def digest(links, picked):
+        """
+        Hash of what a tab's verification depends on: the expected links and the elements picked for them.
+        """
+        rows = []
+        for link_text, expected_url_part in sorted(links.items()):
+            link = picked.get(link_text)
+            rows.append([link_text, expected_url_part] +
+                        ([link["href"], link["onclick"], link["visible"]] if link else [None, None, None]))
+        return hashlib.sha256(json.dumps(rows, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def key(module, tab):
+        return f"{module}:{tab}"
+
+    def unchanged_entry(self, module, tab, digest):
+        """
+        Returns the stored entry if the tab can be skipped, otherwise None.
+        """
+        if self.force_full_run or tab is None:
+            return None
+        with self._lock:
+            entry = self._load().get(self.key(module, tab))
+        if not entry or entry["hash"] != digest or not entry["ok"]:
+            return None
+        if time.time() - entry["verified_at"] >= self.max_age:
+            return None
+        for url in entry["urls"]:
+            # Either TLS setting counts: a target is checked the way its module always checks it
+            cached = self.url_cache.get(url) or self.url_cache.get(url, verify=False)
+            if not cached or not cached["ok"]:
+                return None
+        return entry
+
+    def remember(self, module, tab, digest, ok, urls):
+        """
+        Stores the result of a full verification with the target URLs it checked over HTTP.
+        """
+        if tab is None:
+            return
+        urls = list(dict.fromkeys(urls))
+        with self._lock:
+            self._load()[self.key(module, tab)] = {"hash": digest, "ok": ok, "urls": urls, "verified_at": time.time()}
+            self._dirty = True
+
+    def update_outcome(self, module, tab, ok):
+        """
+        Corrects whether a tab remembered in this run passed, after its failed links were retried.
+        """
+        with self._lock:
+            entry = self._load().get(self.key(module, tab))
+            if entry is not None and entry["ok"] != ok:
+                entry["ok"] = ok
+                self._dirty = True
+
+    def record_skip(self, module, tab, entry):
+        verified_at = datetime.fromtimestamp(entry["verified_at"]).strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock:
+            self.skipped.append((module, tab, verified_at))
+        logger.info(f"⏭️ {module}/{tab} unchanged, verified at {verified_at}")
+        return verified_at
+
+    def format_skipped(self):
+        with self._lock:
+            return "\n".join(f"{module}/{tab}: unchanged, verified at {verified_at}" for module, tab, verified_at in self.skipped)
+
+    def save(self):
+        """
+        Merges this run's entries with the file on disk (newest wins) and writes it atomically.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            merged = self._read_file()
+            for key, entry in self._entries.items():
+                if key not in merged or merged[key]["verified_at"] <= entry["verified_at"]:
+                    merged[key] = entry
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+                tmp_path.write_text(json.dumps(merged, ensure_ascii=False, indent=1), encoding="utf-8")
+                os.replace(tmp_path, self.path)
+                self._entries = merged
+                self._dirty = False
+            except OSError as e:
+                logger.warning(f"⚠️ Failed to save tab state to {self.path}: {e}")
+
+    def _load(self):
+        # Caller holds self._lock
+        if self._entries is None:
+            self._entries = self._read_file()
+        return self._entries
+
+    def _read_file(self):
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Ignoring unreadable tab state {self.path}: {e}")
+            return {}
+
+
+_shared_store = None
+_shared_store_lock = threading.Lock()
+
+
+def get_tab_state_store():
+    global _shared_store
+    with _shared_store_lock:
+        if _shared_store is None:
+            _shared_store = TabStateStore()
+        return _shared_store
@@ -0,0 +1,181 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import allure
+except ImportError:  # page objects also run outside pytest
+    allure = None
+
+# Attributes a child span takes over from its parent when it does not set them itself
+INHERITED_ATTRIBUTES = ("module", "tab")
+
+
+class Span:
+    """
+    One timed operation. Times are epoch nanoseconds, as in OpenTelemetry.
+    """
+
+    __slots__ = ("name", "span_id", "parent_id", "attributes", "start_ns", "end_ns", "error")
+
+    def __init__(self, name, span_id, parent_id, attributes):
+        self.name = name
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+
+    @property
+    def duration(self):
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+
+class Tracer:
+    """
+    Lightweight span recorder for page-object operations.
+    Spans nest per thread; work handed to other threads passes its `parent` explicitly.
+    Coarse spans can also open an Allure step (test thread only, Allure's lifecycle is thread-bound).
+    Set TRACING=off to disable.
+    """
+
+    SERVICE_NAME = "municheck-automation"
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.trace_id = os.urandom(16).hex()
+        self._spans = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def current(self):
+        stack = getattr(self._local, "stack", None)
+        return stack[-1] if stack else None
+
+    @contextmanager
+    def span(self, name, parent=None, allure_step=False, **attributes):
+        if not self.enabled:
+            yield None
+            return
+
+        parent = parent or self.current()
+        if parent is not None:
+            for key in INHERITED_ATTRIBUTES:
+                if attributes.get(key) is None and key in parent.attributes:
+                    attributes[key] = parent.attributes[key]
+        span = Span(name, os.urandom(8).hex(), parent.span_id if parent else None,
+                    {key: value for key, value in attributes.items() if value is not None})
+
+        stack = self._local.__dict__.setdefault("stack", [])
+        stack.append(span)
+        step = None
+        if allure_step and allure is not None and threading.current_thread() is threading.main_thread():
+            step = allure.step(" ".join([name] + [str(span.attributes[k]) for k in ("module", "tab") if k in span.attributes]))
+            step.__enter__()
+        try:
+            yield span
+        except BaseException as e:
+            span.error = str(e)
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            if step is not None:
+                step.__exit__(None, None, None)
+            stack.pop()
+            with self._lock:
+                self._spans.append(span)
+
+    def spans(self):
+        with self._lock:
+            return list(self._spans)
+
+    def summary(self):
+        """
+        Returns {module: {span name: {"count", "seconds", "max"}}}.
+        """
+        table = defaultdict(lambda: defaultdict(lambda: {"count": 0, "seconds": 0.0, "max": 0.0}))
+        for span in self.spans():
+            row = table[span.attributes.get("module", "-")][span.name]
+            row["count"] += 1
+            row["seconds"] += span.duration
+            row["max"] = max(row["max"], span.duration)
+        return {module: dict(rows) for module, rows in table.items()}
+
+    def format_table(self):
+        rows = [f"{'Module':<14}{'Operation':<20}{'Count':>7}{'Total':>11}{'Max':>10}"]
+        for module, operations in sorted(self.summary().items()):
+            for name, row in sorted(operations.items(), key=lambda item: -item[1]["seconds"]):
+                rows.append(f"{module:<14}{name:<20}{row['count']:>7}{row['seconds']:>10.2f}s{row['max']:>9.2f}s")
+        return "\n".join(rows)
+
+    def to_otlp(self):
+        """
+        The recorded spans in OTLP/JSON layout (resourceSpans -> scopeSpans -> spans).
+        """
+        def attribute(key, value):
+            if isinstance(value, bool):
+                return {"key": key, "value": {"boolValue": value}}
+            if isinstance(value, int):
+                return {"key": key, "value": {"intValue": str(value)}}
+            return {"key": key, "value": {"stringValue": str(value)}}
+
+        spans = []
+        for span in self.spans():
+            spans.append({
+                "traceId": self.trace_id,
+                "spanId": span.span_id,
+                "parentSpanId": span.parent_id or "",
+                "name": span.name,
+                "kind": 1,  # SPAN_KIND_INTERNAL
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns),
+                "attributes": [attribute(key, value) for key, value in span.attributes.items()],
+                "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+            })
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [attribute("service.name", self.SERVICE_NAME)]},
+                "scopeSpans": [{"scope": {"name": "pages.tracing"}, "spans": spans}],
+            }]
+        }
+
+    def export_json(self, path):
+        if not self.spans():
+            return None
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_otlp(), ensure_ascii=False), encoding="utf-8")
+        return path
+
+
+def traced(name, allure_step=False, **attributes):
+    """
+    Wraps a page-object method in a span carrying the page's module (and `tab`, which becomes the current tab).
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if "tab" in attributes:
+                self.current_tab = attributes["tab"]
+            with self.span(name, allure_step=allure_step, **attributes):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+_shared_tracer = None
+_shared_tracer_lock = threading.Lock()
+
+
+def get_tracer():
+    global _shared_tracer
+    with _shared_tracer_lock:
+        if _shared_tracer is None:
+            _shared_tracer = Tracer(enabled=os.getenv("TRACING", "on").strip().lower() not in ("off", "0", "false"))
+        return _shared_tracer
@@ -0,0 +1,184 @@
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from urllib.parse import quote, unquote, urlsplit, urlunsplit
+
+logger = logging.getLogger("SystemFlowLogger")
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+class UrlStatusCache:
+    """
+    Persistent, TTL-based cache of link check results, keyed by normalized URL and TLS verification:
+    a result fetched without certificate checks is never served to a caller that verifies them.
+    The timeout is not part of the key. Shared by all modules in a run and saved to disk so later
+    runs can skip fresh entries. Concurrent lookups of the same key are collapsed into a single fetch.
+    """
+
+    DEFAULT_PATH = PROJECT_ROOT / ".cache" / "url_status.json"
+
+    TTL_OK = 24 * 60 * 60        # 200 responses
+    TTL_SUCCESS = 6 * 60 * 60    # other 2xx/3xx responses
+    TTL_FAILURE = 10 * 60        # 4xx/5xx and request errors
+
+    DEFAULT_PORTS = {"http": 80, "https": 443}
+    SAFE_URL_CHARS = "/:@!$&'()*+,;=-._~"
+    # Normalized URLs carry no fragment, so this cannot collide with a real URL
+    UNVERIFIED_SUFFIX = "#tls=off"
+
+    def __init__(self, path=None, enabled=True):
+        self.path = Path(path or os.getenv("LINK_CACHE_PATH") or self.DEFAULT_PATH)
+        self.enabled = enabled
+        self.ttl_ok = int(os.getenv("LINK_CACHE_TTL_OK", self.TTL_OK))
+        self.ttl_success = int(os.getenv("LINK_CACHE_TTL_SUCCESS", self.TTL_SUCCESS))
+        self.ttl_failure = int(os.getenv("LINK_CACHE_TTL_FAILURE", self.TTL_FAILURE))
+
+        self._entries = None
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._inflight = {}
+
+    @classmethod
+    def normalize_url(cls, url):
+        """
+        Builds the cache key: lower-case scheme/host, no default port or fragment,
+        and a single canonical percent-encoding for path and query.
+        """
+        parts = urlsplit(str(url).strip())
+        scheme = parts.scheme.lower()
+        host = (parts.hostname or "").lower()
+        if parts.port and parts.port != cls.DEFAULT_PORTS.get(scheme):
+            host = f"{host}:{parts.port}"
+
+        path = quote(unquote(parts.path), safe=cls.SAFE_URL_CHARS) or "/"
+        query = quote(unquote(parts.query), safe=cls.SAFE_URL_CHARS + "?")
+        return urlunsplit((scheme, host, path, query, ""))
+
+    @classmethod
+    def cache_key(cls, url, verify=True):
+        key = cls.normalize_url(url)
+        return key if verify else key + cls.UNVERIFIED_SUFFIX
+
+    def ttl_for(self, status):
+        if status == 200:
+            return self.ttl_ok
+        if isinstance(status, int) and status < 400:
+            return self.ttl_success
+        return self.ttl_failure
+
+    def get(self, url, ignore_ttl=False, verify=True):
+        """
+        Returns the cached entry ({"ok", "status", "checked_at"}) if it is still fresh, otherwise None.
+        With `ignore_ttl`, any stored entry is returned (offline runs).
+        """
+        if not self.enabled:
+            return None
+        key = self.cache_key(url, verify)
+        with self._lock:
+            entry = self._load().get(key)
+        if entry and (ignore_ttl or time.time() - entry["checked_at"] < self.ttl_for(entry["status"])):
+            return entry
+        return None
+
+    def is_fresh(self, url, verify=True):
+        return self.get(url, verify=verify) is not None
+
+    def put(self, url, ok, status, verify=True):
+        if not self.enabled:
+            return
+        key = self.cache_key(url, verify)
+        with self._lock:
+            self._load()[key] = {"ok": ok, "status": status, "checked_at": time.time()}
+            self._dirty = True
+
+    def get_or_fetch(self, url, fetch, verify=True):
+        """
+        Returns (ok, status, from_cache). On a miss, `fetch()` is called once per URL
+        even when several threads ask for it at the same time.
+        """
+        entry = self.get(url, verify=verify)
+        if entry:
+            return entry["ok"], entry["status"], True
+
+        key = self.cache_key(url, verify)
+        with self._lock:
+            future = self._inflight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if not is_leader:
+            ok, status = future.result()
+            return ok, status, True
+
+        try:
+            ok, status = fetch()
+            self.put(url, ok, status, verify)
+            future.set_result((ok, status))
+            return ok, status, False
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def save(self):
+        """
+        Merges this run's entries with the file on disk (newest wins) and writes it atomically.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            merged = self._read_file()
+            for key, entry in self._entries.items():
+                if key not in merged or merged[key]["checked_at"] < entry["checked_at"]:
+                    merged[key] = entry
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+                tmp_path.write_text(json.dumps(merged, ensure_ascii=False), encoding="utf-8")
+                os.replace(tmp_path, self.path)
+                self._entries = merged
+                self._dirty = False
+            except OSError as e:
+                logger.warning(f"⚠️ Failed to save URL status cache to {self.path}: {e}")
+
+    def _load(self):
+        # Caller holds self._lock
+        if self._entries is None:
+            self._entries = self._read_file()
+        return self._entries
+
+    def _read_file(self):
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Ignoring unreadable URL status cache {self.path}: {e}")
+            return {}
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_url_status_cache():
+    """
+    Returns the process-wide URL status cache. Set LINK_CACHE=off to disable it.
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            enabled = os.getenv("LINK_CACHE", "on").strip().lower() not in ("off", "0", "false")
+            _shared_cache = UrlStatusCache(enabled=enabled)
+        return _shared_cache
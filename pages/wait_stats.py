@@ -0,0 +1,52 @@
+import threading
+from collections import defaultdict
+
+
+class WaitStats:
+    """
+    Per-module accounting of time spent waiting, split by kind:
+      - fixed_sleep: hard-coded delays (wait_for_timeout / time.sleep)
+      - idle_wait:   load-state waits such as "networkidle"
+      - signal_wait: waits on a concrete signal (response, DOM mutation, visible tab panel)
+    """
+
+    KINDS = ("fixed_sleep", "idle_wait", "signal_wait")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seconds = defaultdict(lambda: dict.fromkeys(self.KINDS, 0.0))
+        self._counts = defaultdict(lambda: dict.fromkeys(self.KINDS, 0))
+
+    def record(self, module, kind, seconds):
+        with self._lock:
+            self._seconds[module][kind] += seconds
+            self._counts[module][kind] += 1
+
+    def summary(self):
+        """
+        Returns {module: {kind: {"seconds": float, "count": int}}}.
+        """
+        with self._lock:
+            return {
+                module: {kind: {"seconds": self._seconds[module][kind], "count": self._counts[module][kind]} for kind in self.KINDS}
+                for module in self._seconds
+            }
+
+    def format_table(self):
+        rows = [f"{'Module':<14}{'Fixed sleeps':>18}{'Idle waits':>18}{'Signal waits':>18}"]
+        for module, kinds in sorted(self.summary().items()):
+            cells = "".join(f" {kinds[k]['seconds']:>10.2f}s ({kinds[k]['count']:>3})" for k in self.KINDS)
+            rows.append(f"{module:<14}{cells}")
+        return "\n".join(rows)
+
+    def reset(self):
+        with self._lock:
+            self._seconds.clear()
+            self._counts.clear()
+
+
+_shared_stats = WaitStats()
+
+
+def get_wait_stats():
+    return _shared_stats
@@ -1,12 +1,10 @@
 from playwright.sync_api import Page, expect
-import os
-from datetime import datetime
 from urllib.parse import unquote
-import requests 
 from .base_page import BasePage
+from .link_manifest import load_link_manifest
+from .link_checker import LinkChecker, get_link_checker
+from .tracing import traced
 import logging
-import urllib3
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 logger = logging.getLogger("SystemFlowLogger")
 
@@ -16,8 +14,14 @@ class WaterPage(BasePage):
     Refactored for Playwright - Optimized for SPEED + Clean Structure.
     """
 
+    MODULE_NAME = "water"
+
     PAGE_TITLE_SELECTOR = "h1"
-    GENERIC_LINK_XPATH = "//*[contains(@role, 'button') or self::a][contains(normalize-space(.), '{}')]"
+    LINKS_MUST_BE_VISIBLE = False
+
+    # HTTP status checks of Water links: the site's certificate chain does not verify
+    VERIFY_TLS = False
+    HTTP_TIMEOUT = 10  # seconds
     
     TAB_BUTTON_NAME_2 = "טפסים מקוונים"
     TAB_BUTTON_NAME_3 = "טפסים להורדה"
@@ -25,31 +29,9 @@ class WaterPage(BasePage):
     TAB_2_SELECTOR = f"//button[contains(text(), '{TAB_BUTTON_NAME_2}')]"
     TAB_3_SELECTOR = f"//button[contains(text(), '{TAB_BUTTON_NAME_3}')]"
     
-    DEFAULT_TAB_LINKS = {
-        "תשלום חשבון מים": "https://www.mast.co.il/15657/payment"
-    }
-
-    TAB_2_LINKS = {
-        "נפשות": "form_nefashot.aspx",        
-        "צריכת": "meshutefet",       
-        "הפקדת מפתח": "form_6",  
-        "ביוב": "form_3_pinui_biuv.aspx", 
-        "בירור חיוב": "form_8_zriha_meshutefet.aspx", 
-        "בתעריף מיוחד": "form_5", 
-        "הכרה בתעריף": "form_5_mad_meshuyah.aspx", 
-        "קריאת מונה": "form_6_key.aspx", 
-        "איכות מים": "form_9"
-    }
-
-    TAB_3_LINKS = {
-        "בקשה לביקור": "setvisit.pdf",
-        "בקשה לקבלת": "מידע.pdf",
-        "הוראה": "מונגש",
-        "החלפת": "החלפת",
-        "סניטרית": "סניטרית",
-        "הנדרשים": "טופס",
-        "כשרות": "קרמ.pdf"
-    }
+    DEFAULT_TAB_LINKS = load_link_manifest().links("water", "default_tab")
+    TAB_2_LINKS = load_link_manifest().links("water", "tab_2")
+    TAB_3_LINKS = load_link_manifest().links("water", "tab_3")
 
     def __init__(self, page: Page, url: str):
         super().__init__(page)
@@ -62,31 +44,20 @@ class WaterPage(BasePage):
     def get_page_title(self):
         return self.page.title()
 
-    def _take_error_screenshot(self, link_name):
-        try:
-            if not os.path.exists("screenshots"):
-                os.makedirs("screenshots")
-            timestamp = datetime.now().strftime("%H%M%S") 
-            safe_name = "".join([c if c.isalnum() else "_" for c in link_name])
-            self.page.screenshot(path=f"screenshots/err_{safe_name}_{timestamp}.png")
-        except Exception as e:
-            logger.warning(f"⚠️ Failed to take screenshot: {e}")
-
-    def _verify_external_link(self, link_text, expected_url_part):
+    def _verify_external_link(self, link_text, expected_url_part, link):
+        """
+        Verifies the link attributes on the page.
+        Returns the href when it still needs an HTTP status check, otherwise None.
+        """
         logger.info(f"Testing: {link_text}...") 
         
-        locator = self.page.locator(self.GENERIC_LINK_XPATH.format(link_text))
-        
-        try:
-            # Playwright wait for attachment/visibility
-            locator.wait_for(state="attached", timeout=self.DEFAULT_TIMEOUT)
-        except Exception:
+        if link is None:
             logger.error(f"❌ Not Found: {link_text}")
             self._take_error_screenshot(link_text)
-            return
+            return None
 
-        href = locator.get_attribute("href") or ""
-        onclick = locator.get_attribute("onclick") or ""
+        href = link["href"]
+        onclick = link["onclick"]
         combined_attributes = unquote(href + " " + onclick)
         clean_expected = unquote(expected_url_part).replace("https://", "").replace("http://", "").strip()
 
@@ -95,30 +66,49 @@ class WaterPage(BasePage):
             logger.error(f"   Expected to find: {clean_expected}")
             logger.error(f"   Attributes contained: {combined_attributes}")
             self._take_error_screenshot(link_name=link_text)
-            return
+            return None
 
         if href.startswith("http"):
-            try:
-                # Using requests for status check (similar to original logic but integrated with BasePage style)
-                response = requests.get(href, timeout=10, allow_redirects=True, verify=False)
-                
-                if response.status_code == 404:
-                    logger.error(f"❌ BROKEN LINK (404) for {link_text}: {href}")
-                    self._take_error_screenshot(link_text)
-                elif response.status_code >= 400:
-                    logger.error(f"❌ SERVER ERROR ({response.status_code}) for {link_text}")
-                else:
-                    logger.info(f"✅ OK (Link is Alive - {response.status_code}): {link_text}")
-                    
-            except Exception as e:
-                logger.warning(f"⚠️ Could not verify link status for {link_text}: {e}")
-        else:
-            logger.info(f"✅ OK (Attribute Match, local link skipped HTTP check): {link_text}")
+            return href
+
+        logger.info(f"✅ OK (Attribute Match, local link skipped HTTP check): {link_text}")
+        return None
 
+    def _report_link_status(self, link_text, href, result):
+        if result.status == LinkChecker.SKIPPED_STATUS:
+            logger.info(f"⏭️ Skipped by host policy: {link_text}")
+        elif str(result.status).startswith(LinkChecker.INVALID_DOCUMENT_STATUS):
+            logger.error(f"❌ BROKEN DOCUMENT for {link_text}: {result.status}")
+            self._take_error_screenshot(link_text)
+        elif isinstance(result.status, str):
+            logger.warning(f"⚠️ Could not verify link status for {link_text}: {result.status}")
+        elif result.status == 404:
+            logger.error(f"❌ BROKEN LINK (404) for {link_text}: {href}")
+            self._take_error_screenshot(link_text)
+        elif result.status >= 400:
+            logger.error(f"❌ SERVER ERROR ({result.status}) for {link_text}")
+        else:
+            logger.info(f"✅ OK (Link is Alive - {result.status}): {link_text}")
+
+    def _finish_link_checks(self, results, records):
+        """
+        Checks the HTTP status of every link that passed the attribute check, in one concurrent batch.
+        Each status is stored on the link's attribute-check record, so a link is recorded once.
+        """
+        pending = {link_text: href for link_text, href in results.items() if href}
+
+        statuses = get_link_checker().check_many(pending.values(), verify=self.VERIFY_TLS, timeout=self.HTTP_TIMEOUT)
+        for link_text, href in pending.items():
+            self._record_http_result(statuses[href], link_text, verification=records.get(link_text),
+                                     verify=self.VERIFY_TLS, timeout=self.HTTP_TIMEOUT)
+            self._report_link_status(link_text, href, statuses[href])
+
+    @traced("tab_switch", allure_step=True, tab="tab_2")
     def navigate_to_tab_2(self):
         logger.info(f"\n--- Navigating to Tab 2: {self.TAB_BUTTON_NAME_2} ---")
         self._switch_tab(self.TAB_2_SELECTOR)
 
+    @traced("tab_switch", allure_step=True, tab="tab_3")
     def navigate_to_tab_3(self):
         logger.info(f"\n--- Navigating to Tab 3: {self.TAB_BUTTON_NAME_3} ---")
         self._switch_tab(self.TAB_3_SELECTOR)
@@ -130,16 +120,16 @@ class WaterPage(BasePage):
             # Use force=True to ensure click works even if another element overlaps (common in municipality sites)
             tab.click(force=True)
             logger.info(f">>> Switched successfully.")
-            self.page.wait_for_timeout(1500)
+            self.wait_for_tab_ready(tab)
         except Exception as e:
             logger.error(f"❌ Failed to switch tab: {e}")
             raise e
 
     def run_tab_1_external_link_tests(self):
-        for k, v in self.DEFAULT_TAB_LINKS.items(): self._verify_external_link(k, v)
+        self.verify_links(self.DEFAULT_TAB_LINKS, tab="default_tab")
 
     def run_tab_2_external_link_tests(self):
-        for k, v in self.TAB_2_LINKS.items(): self._verify_external_link(k, v)
+        self.verify_links(self.TAB_2_LINKS, tab="tab_2")
 
     def run_tab_3_external_link_tests(self):
-        for k, v in self.TAB_3_LINKS.items(): self._verify_external_link(k, v)
+        self.verify_links(self.TAB_3_LINKS, tab="tab_3")
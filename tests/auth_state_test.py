@@ -0,0 +1,47 @@
+import json
+import os
+import time
+
+import pytest
+
+from tests.utils.auth_state import AuthStateStore
+
+# Offline: when a saved login session may be reused.
+
+
+def write_state(path, cookies=(), origins=(), age=0):
+    path.write_text(json.dumps({"cookies": list(cookies), "origins": list(origins)}), encoding="utf-8")
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+@pytest.mark.parametrize("cookies, origins, age, fresh", [
+    ([{"name": "session", "expires": time.time() + 3600}], [], 60, True),
+    ([{"name": "session", "expires": -1}], [], 60, True),          # session cookie
+    ([], [{"origin": "https://example.org", "localStorage": []}], 60, True),
+    ([{"name": "session", "expires": time.time() + 3600}], [], 7200, False),  # file too old
+    ([{"name": "session", "expires": time.time() - 60}], [], 60, False),      # cookie expired
+    ([], [], 60, False),                                             # nothing saved
+])
+def test_is_fresh(tmp_path, cookies, origins, age, fresh):
+    store = AuthStateStore(write_state(tmp_path / "state.json", cookies, origins, age), max_age=3600)
+
+    assert store.is_fresh() is fresh
+
+
+def test_a_missing_or_broken_file_is_not_fresh(tmp_path):
+    assert AuthStateStore(tmp_path / "missing.json").is_fresh() is False
+
+    broken = tmp_path / "broken.json"
+    broken.write_text("{not json", encoding="utf-8")
+    assert AuthStateStore(broken).is_fresh() is False
+
+
+def test_invalidate_removes_the_file_once(tmp_path):
+    store = AuthStateStore(write_state(tmp_path / "state.json", [{"name": "session", "expires": -1}]))
+
+    store.invalidate()
+    store.invalidate()
+
+    assert not store.path.exists() and not store.is_fresh()
@@ -0,0 +1,58 @@
+import logging
+
+import pytest
+from playwright.sync_api import Page
+
+from pages.link_manifest import load_link_manifest
+from pages.wait_stats import get_wait_stats
+from tests.utils.benchmark import compare_to_baseline
+from tests.utils.module_tabs import MODULE_TABS
+
+logger = logging.getLogger("SystemFlowLogger")
+
+# Tabs without manifest links run these instead of a link verification
+CUSTOM_STEPS = {
+    ("street", "search"): lambda p: (p.search_and_verify_table(), p.expand_and_verify_popup()),
+}
+
+
+@pytest.mark.parametrize("module", list(MODULE_TABS))
+def test_page_object_benchmark(page: Page, secrets, module, har_mode, benchmark_recorder, benchmark_baseline, benchmark_threshold):
+    page_class, url_key, open_method, tabs = MODULE_TABS[module]
+    url = secrets.get(url_key)
+    if not url:
+        pytest.skip(f"{url_key} missing from .env")
+    if har_mode is not None:
+        har_mode.attach(page.context, module)
+
+    popups = []
+    page.on("popup", popups.append)
+    sleeps_before = get_wait_stats().summary().get(module, {}).get("fixed_sleep", {}).get("count", 0)
+    manifest = load_link_manifest()
+
+    page_object = page_class(page, url)
+    with benchmark_recorder.measure(f"{module}.navigation"):
+        getattr(page_object, open_method)()
+
+    for tab, switch in tabs:
+        if switch is not None:
+            with benchmark_recorder.measure(f"{module}.tab.{tab}"):
+                switch(page_object)
+        links = manifest.links(module, tab)
+        if (module, tab) in CUSTOM_STEPS:
+            with benchmark_recorder.measure(f"{module}.steps.{tab}"):
+                CUSTOM_STEPS[(module, tab)](page_object)
+        else:
+            with benchmark_recorder.measure(f"{module}.links.{tab}.per_link", items=len(links)):
+                page_object.verify_links(links, tab=tab)
+
+    sleeps_after = get_wait_stats().summary().get(module, {}).get("fixed_sleep", {}).get("count", 0)
+    benchmark_recorder.count(f"{module}.fixed_sleeps", sleeps_after - sleeps_before)
+    benchmark_recorder.count(f"{module}.popups", len(popups))
+
+    if benchmark_baseline is None:
+        return
+    regressions = compare_to_baseline(benchmark_recorder.module_metrics(module), benchmark_baseline, benchmark_threshold)
+    if regressions:
+        logger.error(f"❌ {module} benchmark regressed:\n" + "\n".join(regressions))
+        pytest.fail(f"{module} benchmark regressed against the baseline:\n" + "\n".join(regressions))
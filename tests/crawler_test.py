@@ -0,0 +1,52 @@
+import json
+import logging
+
+import allure
+import pytest
+from playwright.sync_api import Page
+
+from pages.link_manifest import load_link_manifest
+from tests.utils.module_tabs import MODULE_TABS
+
+logger = logging.getLogger("SystemFlowLogger")
+
+
+@pytest.mark.parametrize("module", list(MODULE_TABS))
+def test_crawl_module(page: Page, secrets, module, har_mode, link_inventory, crawl_checker):
+    """
+    Walks every tab of a module, harvests all outbound links and checks them concurrently.
+    The inventory and its diff against the manifest are written at the end of the session (--crawl-output).
+    """
+    page_class, url_key, open_method, tabs = MODULE_TABS[module]
+    url = secrets.get(url_key)
+    if not url:
+        pytest.skip(f"{url_key} missing from .env")
+    if har_mode is not None:
+        har_mode.attach(page.context, module)
+
+    manifest = load_link_manifest()
+    page_object = page_class(page, url)
+    getattr(page_object, open_method)()
+
+    for tab, switch in tabs:
+        if switch is not None:
+            try:
+                switch(page_object)
+            except Exception as e:
+                logger.warning(f"⚠️ Crawler could not open {module}/{tab}, skipping it: {e}")
+                continue
+        expected_texts = list(manifest.links(module, tab)) or None
+        harvested = page_object.harvest_links(wait_for_texts=expected_texts)
+        link_inventory.add(module, tab, harvested)
+        logger.info(f"🕸️ {module}/{tab}: harvested {len(harvested)} elements")
+
+    results = link_inventory.check(module, crawl_checker)
+    broken = sorted(url for url, result in results.items() if not result.ok)
+    logger.info(f"🕸️ {module}: checked {len(results)} outbound links, {len(broken)} broken")
+
+    allure.attach(
+        json.dumps(sorted(link_inventory.links.get(module, {}).values(), key=lambda e: e["url"]), indent=2, ensure_ascii=False),
+        name=f"{module} link inventory", attachment_type=allure.attachment_type.JSON,
+    )
+    if broken:
+        logger.error(f"❌ {module} broken outbound links:\n" + "\n".join(broken))
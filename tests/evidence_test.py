@@ -0,0 +1,51 @@
+from pages.evidence import EvidenceService
+
+# Offline: one capture per page state, attached to the report once.
+
+
+class FakePage:
+    def __init__(self):
+        self.state = "state-1"
+        self.screenshots = 0
+
+    def evaluate(self, script):
+        return self.state
+
+    def screenshot(self, **options):
+        self.screenshots += 1
+        return b"image-%d" % self.screenshots
+
+
+class FakeReporter:
+    def __init__(self):
+        self.attachments = []
+
+    def attach(self, body, name, attachment_type):
+        self.attachments.append((body, name))
+
+
+def test_the_same_failure_twice_is_captured_and_attached_once(tmp_path):
+    service = EvidenceService(directory=tmp_path)
+    page, reporter = FakePage(), FakeReporter()
+
+    first = service.capture(page, "business", "אזור אישי", reporter)
+    second = service.capture(page, "business", "אזור אישי", reporter)
+    service.flush()
+
+    assert first == second and first.read_bytes() == b"image-1"
+    assert (page.screenshots, service.captured, service.deduplicated) == (1, 1, 1)
+    assert reporter.attachments == [(b"image-1", first.name)]
+
+
+def test_a_changed_page_is_captured_again(tmp_path):
+    service = EvidenceService(directory=tmp_path, image_type="png")
+    page, reporter = FakePage(), FakeReporter()
+
+    first = service.capture(page, "water", "tab_2", reporter)
+    page.state = "state-2"
+    second = service.capture(page, "water", "tab_2", reporter)
+    service.flush()
+
+    assert first != second and second.suffix == ".png"
+    assert [body for body, _ in reporter.attachments] == [b"image-1", b"image-2"]
+    assert sorted(path.read_bytes() for path in tmp_path.iterdir()) == [b"image-1", b"image-2"]
@@ -0,0 +1,350 @@
+import logging
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from pages import base_page, water_page
+from pages.base_page import BasePage
+from pages.host_guard import HostGuard
+from pages.host_policy import HostPolicy
+from pages.link_checker import LinkChecker
+from pages.link_results import LinkResultStore, read_jsonl
+from pages.retry_phase import RetryPolicy, retry_failed_http_checks, retry_failed_popups
+from pages.tab_state import TabStateStore
+from pages.url_status_cache import UrlStatusCache
+from pages.water_page import WaterPage
+
+logger = logging.getLogger("SystemFlowLogger")
+
+# Offline tests against the local fault server: no browser, no live municipal hosts.
+
+
+@pytest.fixture
+def checker():
+    checker = LinkChecker(max_workers=8, timeout=1, max_per_host=8)
+    yield checker
+    checker.close()
+
+
+def test_unverified_results_are_not_served_to_verifying_callers(faults, tmp_path):
+    checker = LinkChecker(timeout=1, cache=UrlStatusCache(tmp_path / "url_status.json"))
+    url = faults.url("/status/200")
+
+    assert checker.check(url, verify=False).strategy == "head"
+    assert checker.check(url, verify=False).strategy == "cache"
+    assert checker.check(url).strategy == "head"
+    assert checker.check(url).strategy == "cache"
+    checker.close()
+
+    assert faults.hits["HEAD /status/200"] == 2
+
+
+def test_head_405_falls_back_to_get(checker, faults):
+    result = checker.check(faults.url("/head405"))
+
+    assert result.ok and result.status == 200
+    assert faults.hits["HEAD /head405"] == 1
+    assert faults.hits["GET /head405"] == 1
+
+
+@pytest.mark.parametrize("code", [404, 500])
+def test_error_statuses_are_broken(checker, faults, code):
+    result = checker.check(faults.url(f"/status/{code}"))
+
+    assert not result.ok
+    assert result.status == code
+
+
+def test_redirect_chain_is_followed(checker, faults):
+    result = checker.check(faults.url("/redirect/5"))
+
+    assert result.ok and result.status == 200
+
+
+def test_redirect_loop_is_reported(checker, faults):
+    result = checker.check(faults.url("/loop"))
+
+    assert not result.ok
+    assert "redirect" in str(result.status).lower()
+
+
+def test_slow_first_byte_times_out(checker, faults):
+    started = time.monotonic()
+    result = checker.check(faults.url("/slow?delay=3"))
+
+    assert not result.ok
+    assert time.monotonic() - started < 2.5
+
+
+def test_hanging_connection_times_out(checker, faults):
+    started = time.monotonic()
+    result = checker.check(faults.url("/hang"))
+
+    assert not result.ok
+    assert time.monotonic() - started < 2.5
+
+
+def test_large_pdf_head_skips_the_body(checker, faults):
+    result = checker.check(faults.url("/pdf?size=500000000"))
+
+    assert result.ok
+    assert faults.hits["GET /pdf"] == 0
+
+
+def test_large_pdf_get_fallback_is_not_downloaded(checker, faults):
+    # 500 MB behind a HEAD that is refused: the streamed GET must be closed after the headers
+    started = time.monotonic()
+    result = checker.check(faults.url("/pdf?size=500000000&head=405"))
+
+    assert result.ok
+    assert faults.hits["GET /pdf"] == 1
+    assert time.monotonic() - started < 1
+
+
+@pytest.mark.parametrize("ranged", [True, False])
+def test_document_probe_reads_only_the_first_bytes(checker, faults, ranged):
+    # 50 MB behind a server that either honors the Range header or ignores it and streams everything
+    result = checker.check(faults.url(f"/pdf/form.pdf?size=50000000&range={int(ranged)}"))
+
+    assert result.ok and result.status == (206 if ranged else 200)
+    assert faults.hits["HEAD /pdf/form.pdf"] == 0
+    assert checker.transfer["bytes_read"] <= checker.document_bytes
+    assert checker.transfer["document_bytes"] == 50000000
+
+
+def test_html_served_for_a_document_is_broken(checker, faults):
+    result = checker.check(faults.url("/soft404/form.pdf"))
+
+    assert not result.ok
+    assert str(result.status).startswith(LinkChecker.INVALID_DOCUMENT_STATUS)
+
+
+def test_batch_runs_concurrently(checker, faults):
+    urls = [faults.url(f"/slow?delay=0.5&n={i}") for i in range(16)]
+    started = time.monotonic()
+    results = checker.check_many(urls)
+    elapsed = time.monotonic() - started
+
+    assert all(result.ok for result in results.values())
+    # 16 half-second targets on 8 workers: two waves, far below the 8s a sequential run takes
+    assert elapsed < 2.5
+    logger.info(f"⏱️ check_many: {len(urls)} slow targets in {elapsed:.2f}s")
+
+
+def test_per_host_limit_caps_concurrency(faults):
+    checker = LinkChecker(max_workers=8, timeout=2, max_per_host=2)
+    urls = [faults.url(f"/slow?delay=0.5&n={i}") for i in range(4)]
+    started = time.monotonic()
+    results = checker.check_many(urls)
+    elapsed = time.monotonic() - started
+    checker.close()
+
+    assert all(result.ok for result in results.values())
+    # 4 targets on one host, 2 at a time: two waves despite 8 free workers
+    assert elapsed >= 1.0
+
+
+def test_circuit_breaker_marks_host_unavailable_then_probes(faults):
+    guard = HostGuard(failure_threshold=2, cooldown=0.3)
+    checker = LinkChecker(max_workers=1, timeout=1, host_guard=guard)
+    urls = [faults.url(f"/status/503?n={i}") for i in range(5)]
+    results = checker.check_many(urls)
+
+    # Two failures open the circuit: the other three are answered without a request
+    assert [results[url].status for url in urls] == [503, 503] + [LinkChecker.HOST_UNAVAILABLE_STATUS] * 3
+    assert faults.hits["HEAD /status/503"] == 2
+    assert guard.rejected["127.0.0.1"] == 3
+
+    time.sleep(0.35)
+    assert checker.check(faults.url("/ok")).ok
+    assert guard.state("127.0.0.1") == "closed"
+    checker.close()
+
+
+def test_token_bucket_limits_request_rate():
+    guard = HostGuard(rate=10, burst=1)
+    started = time.monotonic()
+    for _ in range(4):
+        guard.throttle("example.org")
+
+    # One request from the burst, then one every 100ms
+    assert time.monotonic() - started >= 0.28
+
+
+def test_policy_skip_sends_no_request(faults):
+    policy = HostPolicy({"hosts": [{"pattern": "127.0.0.1", "strategy": "skip"}]})
+    checker = LinkChecker(timeout=1, host_policy=policy)
+    result = checker.check(faults.url("/status/404"))
+    checker.close()
+
+    assert result.ok and result.status == LinkChecker.SKIPPED_STATUS
+    assert sum(faults.hits.values()) == 0
+
+
+def test_learned_head_rejection_goes_straight_to_get(faults, tmp_path):
+    facts_path = tmp_path / "host_facts.json"
+    checker = LinkChecker(timeout=1, host_policy=HostPolicy({}, facts_path=facts_path))
+    assert checker.check(faults.url("/head405?n=1")).ok
+    checker.host_policy.save()
+    checker.close()
+
+    # A later run loads the fact and skips the HEAD it knows will be rejected
+    checker = LinkChecker(timeout=1, host_policy=HostPolicy({}, facts_path=facts_path))
+    assert checker.check(faults.url("/head405?n=2")).ok
+    checker.close()
+
+    assert faults.hits["HEAD /head405"] == 1
+    assert faults.hits["GET /head405"] == 2
+
+
+def test_validate_link_status_records_broken_links(faults, monkeypatch):
+    checker = LinkChecker(timeout=1)
+    store = LinkResultStore()
+    monkeypatch.setattr(base_page, "get_link_checker", lambda: checker)
+    monkeypatch.setattr(base_page, "get_link_result_store", lambda: store)
+    page = BasePage(SimpleNamespace())
+    page.current_tab = "tab_1"
+
+    assert page.validate_link_status(faults.url("/head405")) == (True, 200)
+    assert page.validate_link_status(faults.url("/status/404"), link_text="טופס") == (False, 404)
+    checker.close()
+
+    assert len(store) == 2
+    [broken] = store.broken()
+    assert (broken.tab, broken.link_text, broken.url, broken.status) == ("tab_1", "טופס", faults.url("/status/404"), 404)
+    assert broken.strategy == "get" and broken.latency > 0
+    assert page.failed_links == [faults.url("/status/404")]
+
+
+def test_water_http_check_updates_the_attribute_record(faults, monkeypatch):
+    checker = LinkChecker(timeout=1)
+    store = LinkResultStore()
+    monkeypatch.setattr(water_page, "get_link_checker", lambda: checker)
+    monkeypatch.setattr(base_page, "get_link_result_store", lambda: store)
+    page = WaterPage(SimpleNamespace(), faults.url("/"))
+    page.current_tab = "tab_3"
+
+    results, records = {}, {}
+    for link_text, path in (("בקשה לביקור", "/head405"), ("כשרות", "/status/500")):
+        link = {"text": link_text, "href": faults.url(path), "onclick": "", "visible": True}
+        results[link_text], records[link_text] = page._verify_and_record(link_text, path, link)
+    page._finish_link_checks(results, records)
+    checker.close()
+
+    assert len(store) == 2
+    assert [(r.link_text, r.status, r.strategy) for r in store.query()] == [("בקשה לביקור", 200, "get"), ("כשרות", 500, "get")]
+    assert [r.link_text for r in store.broken()] == ["כשרות"]
+    assert not store.failed_verifications()
+
+
+def test_link_result_store_indexes_and_exports(tmp_path):
+    store = LinkResultStore()
+    store.record("water", "tab_3", "בקשה לביקור", "https://example.org/setvisit.pdf", 206, True, "document", 0.1)
+    store.record("water", "tab_3", "כשרות", "https://example.org/x.pdf", 404, False, "document", 0.1)
+    store.record("water", "tab_3", "כשרות", "https://example.org/x.pdf", 404, False, "document", 0.2)  # duplicate
+    store.record("daycare", "tab_1", "אזור אישי", None, "not_found", False, "attributes", 0.0)
+
+    assert len(store) == 3
+    assert [r.link_text for r in store.query(module="water", ok=False)] == ["כשרות"]
+    assert [r.module for r in store.broken()] == ["water"]
+    assert [r.status for r in store.failed_verifications()] == ["not_found"]
+
+    path = store.export_jsonl(tmp_path / "results.jsonl")
+    assert list(read_jsonl(path)) == store.query()
+
+
+def test_only_answered_failures_count_as_broken():
+    store = LinkResultStore()
+    store.record("water", "tab_3", "כשרות", "https://example.org/x.pdf", 404, False, "document", 0.1)
+    store.record("water", "tab_3", "טופס", "https://example.org/form.pdf", f"{LinkChecker.INVALID_DOCUMENT_STATUS}: text/html",
+                 False, "document", 0.1)
+    store.record("water", "tab_2", "בקשה", "https://down.example/a", "Read timed out.", False, "head", 1.0)
+    store.record("water", "tab_2", "ערר", "https://down.example/b", LinkChecker.HOST_UNAVAILABLE_STATUS, False, "circuit_open", 0.0)
+
+    assert [r.link_text for r in store.broken()] == ["כשרות", "טופס"]
+    assert [r.link_text for r in store.unreachable()] == ["בקשה", "ערר"]
+    assert len(store.failed_http_checks()) == 4
+
+
+def test_retry_phase_marks_recovered_links_flaky(faults):
+    checker = LinkChecker(timeout=1)
+    store = LinkResultStore()
+    # HEAD and GET of the main pass both get a 503, the retry's HEAD gets through
+    for url in (faults.url("/flaky?fail=2&key=a"), faults.url("/status/404")):
+        result = checker.check(url)
+        store.record("water", "tab_3", None, url, result.status, result.ok, result.strategy, result.latency)
+    assert len(store.broken()) == 2
+
+    recovered = retry_failed_http_checks(store, checker, RetryPolicy(attempts=3, base_delay=0.05))
+    checker.close()
+
+    assert [r.url for r in recovered] == [faults.url("/flaky?fail=2&key=a")]
+    assert [(r.attempts, r.status) for r in store.flaky()] == [(2, 200)]
+    [broken] = store.broken()
+    assert (broken.status, broken.attempts) == (404, 3)
+
+
+def test_retry_checks_with_the_options_of_the_first_check(faults, tmp_path):
+    checker = LinkChecker(timeout=1, cache=UrlStatusCache(tmp_path / "url_status.json"))
+    store = LinkResultStore()
+    url = faults.url("/flaky?fail=2&key=tls")
+    result = checker.check(url, verify=False, timeout=2)
+    store.record("water", "tab_3", "טופס", url, result.status, result.ok, result.strategy, result.latency,
+                 verify=False, timeout=2)
+
+    requested = []
+    fetch = checker._fetch
+    checker._fetch = lambda url, rule, verify, timeout: requested.append((verify, timeout)) or fetch(url, rule, verify, timeout)
+    recovered = retry_failed_http_checks(store, checker, RetryPolicy(attempts=2, base_delay=0.01))
+    checker.close()
+
+    assert len(recovered) == 1 and requested == [(False, 2)]
+    assert checker.cache.get(url, verify=False)["ok"]
+    assert checker.cache.get(url) is None
+
+
+def test_popup_retries_run_after_the_module_and_update_the_tab(tmp_path, monkeypatch):
+    tab_state = TabStateStore(tmp_path / "tab_hashes.json", force_full_run=False)
+    monkeypatch.setattr("pages.retry_phase.get_tab_state_store", lambda: tab_state)
+    store = LinkResultStore()
+    flaky = store.record("business", "tab_2", "טופס", None, "failed", False, "popup_intercept", 1.0)
+    dead = store.record("business", "tab_3", "מדריך", None, "failed", False, "popup_load", 1.0)
+    store.record("business", "tab_3", "אזור אישי", None, "not_found", False, "attributes", 0.0)  # no popup to retry
+    tab_state.remember("business", "tab_2", "hash", False, [])
+
+    opened, slept = [], []
+
+    class FakePage:
+        def __init__(self, tab):
+            self.tab = tab
+
+        def sleep(self, milliseconds):
+            slept.append(milliseconds)
+
+        def retry_links(self, records, attempt):
+            for record in records:
+                ok = record is flaky
+                store.update(record, ok=ok, status="verified" if ok else "failed", attempts=attempt)
+            return [record for record in records if record.ok]
+
+    def open_tab(tab):
+        opened.append(tab)
+        return FakePage(tab)
+
+    recovered = retry_failed_popups("business", open_tab, store, RetryPolicy(attempts=3, base_delay=0.01))
+
+    assert recovered == [flaky] and flaky.is_flaky
+    assert (dead.ok, dead.attempts) == (False, 3)
+    # tab_2 recovered in the first round, tab_3 is reopened for every attempt
+    assert opened == ["tab_2", "tab_3", "tab_3"]
+    assert slept and all(milliseconds <= 20 for milliseconds in slept)
+    assert tab_state.unchanged_entry("business", "tab_2", "hash") is not None
+
+
+def test_retry_delays_back_off_with_jitter():
+    delays = list(RetryPolicy(attempts=5, base_delay=1, max_delay=4).delays())
+
+    assert len(delays) == 4
+    for delay, cap in zip(delays, [1, 2, 4, 4]):
+        assert cap / 2 <= delay <= cap
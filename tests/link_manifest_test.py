@@ -0,0 +1,51 @@
+import pytest
+
+from pages.link_manifest import TextMatcher, get_text_matcher, normalize_text
+
+# Offline: link text normalization and the Aho-Corasick matcher that picks harvested links.
+
+
+@pytest.mark.parametrize("raw, normalized", [
+    ("שָׁלוֹם", "שלום"),                          # niqqud
+    ("טופס\u00a0בקשה", "טופס בקשה"),         # non-breaking space
+    ("  אזור \n\t אישי ", "אזור אישי"),           # whitespace runs
+    ("\u200fתשלום\u200e דוחות", "תשלום דוחות"),  # RTL/LTR marks
+    ("מע״מ", 'מע"מ'),                        # gershayim
+    ("צ׳ק", "צ'ק"),                          # geresh
+    ("בית־ספר", "בית־ספר"),                       # maqaf is kept
+    (None, ""),
+])
+def test_normalize_text(raw, normalized):
+    assert normalize_text(raw) == normalized
+
+
+def test_overlapping_patterns_are_all_found():
+    matcher = TextMatcher(["תשלום", "תשלום דוחות", "דוחות חניה", "חניה"])
+
+    assert matcher.search("תשלום דוחות חניה") == {"תשלום", "תשלום דוחות", "דוחות חניה", "חניה"}
+    assert matcher.search("דוחות") == set()
+
+
+def test_shared_prefixes_follow_failure_links():
+    matcher = TextMatcher(["טופס בקשה", "טופס ביטול", "ביטול"])
+
+    assert matcher.search("טופס ביטול") == {"טופס ביטול", "ביטול"}
+    # The walk fails out of "טופס ב..." and must still find "ביטול" after it
+    assert matcher.search("טופס בביטול") == {"ביטול"}
+    assert matcher.search("טופס בקשה לביטול") == {"טופס בקשה", "ביטול"}
+
+
+def test_patterns_and_texts_are_normalized_alike():
+    matcher = TextMatcher(["מע״מ", "אזור אישי"])
+
+    assert matcher.search('החזר מע"מ') == {"מע״מ"}
+    assert matcher.search("כְּנִיסָה לאזור  אישי") == {"אזור אישי"}
+
+
+def test_match_lists_every_text_position_per_pattern():
+    matcher = get_text_matcher({"אזור אישי": "PrivateArea", "טופס": "forms"})
+
+    matches = matcher.match(["טופס", "כניסה", "אזור אישי - טופס", ""])
+
+    assert matches == {"אזור אישי": [2], "טופס": [0, 2]}
+    assert get_text_matcher(["אזור אישי", "טופס"]) is matcher
@@ -3,12 +3,9 @@ import logging
 import pytest
 import time
 from datetime import datetime
-import sys
 
 current_file_path = Path(__file__).resolve()
 project_root = current_file_path.parent.parent
-if str(project_root) not in sys.path:
-    sys.path.append(str(project_root))
 
 from pages.login_page import LoginPage
 
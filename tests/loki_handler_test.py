@@ -0,0 +1,77 @@
+import logging
+import time
+
+import pytest
+
+from tests.utils.loki_handler import LokiHandler
+
+# Offline: batching, drop policies and draining of the Loki shipper, with _push stubbed out.
+
+
+@pytest.fixture
+def make_handler():
+    handlers = []
+
+    def make(**kwargs):
+        handler = LokiHandler(url="http://loki.invalid/push", job_name="test", **{"flush_interval": 10, **kwargs})
+        handler.pushed = []
+        handler._push = lambda batch: handler.pushed.append([message for _, _, message in batch])
+        handlers.append(handler)
+        return handler
+
+    yield make
+    for handler in handlers:
+        handler.close()
+
+
+def log(handler, *messages):
+    for message in messages:
+        handler.handle(logging.makeLogRecord({"msg": message, "levelname": "INFO"}))
+
+
+def test_full_batches_are_pushed_without_waiting(make_handler):
+    handler = make_handler(batch_size=2)
+    log(handler, "a", "b", "c", "d")
+
+    deadline = time.monotonic() + 2
+    while sum(map(len, handler.pushed)) < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert handler.pushed == [["a", "b"], ["c", "d"]]
+
+
+def test_flush_pushes_partial_batches_without_waiting_for_the_interval(make_handler):
+    handler = make_handler(batch_size=3)
+    log(handler, *"abcdefg")
+
+    started = time.monotonic()
+    handler.flush(timeout=5)
+
+    assert time.monotonic() - started < 1
+    assert [message for batch in handler.pushed for message in batch] == list("abcdefg")
+    assert handler.pushed[-1] == ["g"]
+
+
+@pytest.mark.parametrize("policy, kept", [
+    (LokiHandler.DROP_OLDEST, ["c", "d", "e"]),
+    (LokiHandler.DROP_NEWEST, ["a", "b", "c"]),
+])
+def test_a_full_buffer_drops_by_policy(make_handler, policy, kept):
+    handler = make_handler(batch_size=100, buffer_size=3, drop_policy=policy)
+    log(handler, *"abcde")
+
+    assert handler.dropped == 2
+    handler.flush(timeout=5)
+    assert handler.pushed == [kept]
+
+
+def test_close_drains_the_buffer_and_ignores_later_records(make_handler):
+    handler = make_handler(batch_size=100)
+    log(handler, "a", "b", "c")
+
+    started = time.monotonic()
+    handler.close()
+    log(handler, "after close")
+
+    assert time.monotonic() - started < 1
+    assert handler.pushed == [["a", "b", "c"]]
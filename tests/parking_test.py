@@ -1,6 +1,4 @@
 from pathlib import Path
-import sys
-from sys import path
 import time
 from datetime import datetime
 import logging
@@ -9,8 +7,6 @@ from playwright.sync_api import Page
 
 current_file_path = Path(__file__).resolve()
 project_root = current_file_path.parent.parent
-if str(project_root) not in path:
-    path.append(str(project_root))
 
 from pages.parking_page import ParkingPage
 
@@ -0,0 +1,433 @@
+"""
+The suite's pytest plugin: options, fixtures and session hooks, registered by the root conftest.py.
+Startup is kept light: the run log file is created on the first record, Loki connects on its first push,
+and the page-object singletons and fixture-specific helpers are imported by the hook or fixture that needs them.
+"""
+import time
+
+_import_started = time.perf_counter()
+
+import pytest
+import sys
+import logging
+import os
+import platform  
+import socket
+from datetime import datetime
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent
+
+LOKI_URL = os.environ.get("LOKI_URL", "http://127.0.0.1:3100/loki/api/v1/push")
+
+log_dir = project_root / "logs"
+log_filename = log_dir / f"test_run_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.log"
+
+logger = logging.getLogger("SystemFlowLogger")
+
+
+class RunLogFileHandler(logging.FileHandler):
+    """ Opens the run log (creating logs/) on the first record, so runs that log nothing leave no file behind. """
+
+    def __init__(self, path):
+        super().__init__(path, encoding='utf-8', delay=True)
+
+    def _open(self):
+        Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
+
+
+def configure_logging():
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    if logger.handlers:
+        return
+    from tests.utils.loki_handler import LokiHandler
+
+    formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
+
+    file_handler = RunLogFileHandler(log_filename)
+    file_handler.setFormatter(formatter)
+    logger.addHandler(file_handler)
+
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(formatter)
+    logger.addHandler(console_handler)
+
+    loki_handler = LokiHandler(
+        url=LOKI_URL, job_name="links_automation",
+        batch_size=int(os.environ.get("LOKI_BATCH_SIZE", 200)),
+        flush_interval=float(os.environ.get("LOKI_FLUSH_INTERVAL", 2.0)),
+        buffer_size=int(os.environ.get("LOKI_BUFFER_SIZE", 10000)),
+        gzip_enabled=os.environ.get("LOKI_GZIP") == "1",
+        drop_policy=os.environ.get("LOKI_DROP_POLICY", LokiHandler.DROP_OLDEST),
+    )
+    loki_handler.setFormatter(formatter)
+    logger.addHandler(loki_handler)
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--flow-workers", action="store", type=int, default=int(os.environ.get("FLOW_WORKERS", 1)),
+        help="Run the full-flow modules in N parallel browser contexts on one shared Chromium (default: 1, sequential)."
+    )
+    parser.addoption(
+        "--reuse-auth", action="store_true", default=os.environ.get("REUSE_AUTH") == "1",
+        help="Log in once, save the storage state and reuse it in every browser context and later runs."
+    )
+    parser.addoption(
+        "--record-har", action="store", default=os.environ.get("RECORD_HAR"), metavar="DIR",
+        help="Record each module's traffic to DIR/<module>.har."
+    )
+    parser.addoption(
+        "--replay-har", action="store", default=os.environ.get("REPLAY_HAR"), metavar="DIR",
+        help="Serve each module's traffic from DIR/<module>.har with no network; link checks answer from the URL cache."
+    )
+    parser.addoption(
+        "--browser-server", action="store_true", default=os.environ.get("BROWSER_SERVER") == "1",
+        help="Connect to a warm Chromium kept running between sessions instead of launching one (also BROWSER_SERVER=1)."
+    )
+    parser.addoption(
+        "--full-run", action="store_true", default=os.environ.get("FORCE_FULL_RUN") == "1",
+        help="Verify every tab, even those unchanged since a passing run (also FORCE_FULL_RUN=1)."
+    )
+
+    parser.addoption(
+        "--import-profile", action="store_true", default=False,
+        help="Report the import and collection time of each test module and of this plugin's imports."
+    )
+
+    parser.addoption(
+        "--run-history", action="store", default=None, metavar="PATH",
+        help="SQLite database the run's link results and timings are appended to ('off' disables; also RUN_HISTORY_PATH)."
+    )
+
+    group = parser.getgroup("benchmark")
+    group.addoption(
+        "--benchmark", action="store_true", default=False,
+        help="Run the page-object benchmarks (tests/benchmark_test.py). Best combined with --replay-har."
+    )
+    group.addoption(
+        "--benchmark-json", action="store", default=str(project_root / "benchmarks" / "results.json"),
+        help="Where to write this run's benchmark metrics."
+    )
+    group.addoption(
+        "--benchmark-baseline", action="store",
+        default=os.environ.get("BENCHMARK_BASELINE", str(project_root / "benchmarks" / "baseline.json")),
+        help="Stored baseline the benchmarks are compared against."
+    )
+    group.addoption(
+        "--benchmark-save-baseline", action="store_true", default=False,
+        help="Write this run's metrics as the new baseline instead of comparing."
+    )
+    group.addoption(
+        "--benchmark-threshold", action="store", type=float, default=float(os.environ.get("BENCHMARK_THRESHOLD", 0.25)),
+        help="Allowed slowdown against the baseline as a fraction (default: 0.25)."
+    )
+
+    group = parser.getgroup("crawl")
+    group.addoption(
+        "--crawl", action="store_true", default=os.environ.get("CRAWL") == "1",
+        help="Run the link-discovery crawler (tests/crawler_test.py) over every module tab (also CRAWL=1)."
+    )
+    group.addoption(
+        "--crawl-output", action="store", default=os.environ.get("CRAWL_OUTPUT", str(project_root / "link_inventory.json")),
+        help="Where to write the link inventory and its diff against the manifest."
+    )
+
+# Per-module test files whose HAR name differs from "<file>_test" (None: the test attaches HARs itself)
+HAR_MODULE_BY_TEST_FILE = {"enfo_test": "enforcement", "loginTest": "login", "test_full_flow": None, "benchmark_test": None, "crawler_test": None}
+
+def pytest_configure(config):
+    configure_logging()
+    if config.getoption("--import-profile"):
+        from tests.utils.import_profile import ImportProfile
+        config.pluginmanager.register(ImportProfile(PLUGIN_IMPORT_SECONDS), "import-profile")
+    if config.getoption("--full-run"):
+        from pages.tab_state import get_tab_state_store
+        get_tab_state_store().force_full_run = True
+    run_history = config.getoption("--run-history")
+    if run_history:
+        from tests.utils.run_history import get_run_history
+        get_run_history().enabled = run_history.lower() != "off"
+        if get_run_history().enabled:
+            get_run_history().path = Path(run_history)
+
+def pytest_collection_modifyitems(config, items):
+    """ Benchmarks and the crawler are opt-in: skip them before any browser fixture starts unless asked for. """
+    opt_in = [
+        ("benchmark_recorder", "--benchmark", "benchmarks only run with --benchmark"),
+        ("link_inventory", "--crawl", "the link crawler only runs with --crawl"),
+    ]
+    for fixture, option, reason in opt_in:
+        if config.getoption(option):
+            continue
+        skip = pytest.mark.skip(reason=reason)
+        for item in items:
+            if fixture in getattr(item, "fixturenames", ()):
+                item.add_marker(skip)
+
+def is_running_on_server():
+    server_names = ["SERVER-PROD", "NODE-01"] 
+    current_node = platform.node()
+    return (current_node in server_names or 
+            os.environ.get("RUN_ENV") == "server" or 
+            os.environ.get("GITHUB_ACTIONS") == "true")
+
+@pytest.fixture(scope="session", autouse=True)
+def cleanup_zombies_before_run(pytestconfig):
+    """ Cleanup any lingering browser processes. The browser server only ever stops the processes it owns. """
+    if pytestconfig.getoption("--browser-server"):
+        return
+    if platform.system() == "Windows":
+        os.system("taskkill /f /im chrome.exe /t >nul 2>&1")
+        os.system("taskkill /f /im chromedriver.exe /t >nul 2>&1")
+        os.system("taskkill /f /im msedge.exe /t >nul 2>&1")
+    else:
+        os.system("pkill -f chrome || true")
+        os.system("pkill -f chromedriver || true")
+        os.system("pkill -f msedge || true")
+    
+    time.sleep(1)
+
+@pytest.fixture(scope="session")
+def flow_workers(pytestconfig):
+    return max(1, pytestconfig.getoption("--flow-workers"))
+
+@pytest.fixture(scope="session")
+def cdp_port(pytestconfig, flow_workers, browser_name):
+    """ Free local port for Chromium's DevTools endpoint, only needed when modules run in parallel on a launched browser. """
+    if flow_workers <= 1 or browser_name != "chromium" or pytestconfig.getoption("--browser-server"):
+        return None
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+@pytest.fixture(scope="session")
+def browser_type_launch_args(browser_type_launch_args, cdp_port):
+    if cdp_port is None:
+        return browser_type_launch_args
+    args = [*browser_type_launch_args.get("args", []), f"--remote-debugging-port={cdp_port}"]
+    return {**browser_type_launch_args, "args": args}
+
+@pytest.fixture(scope="session")
+def browser_server(pytestconfig, browser_name, browser_type, browser_type_launch_args):
+    """ Websocket endpoint of the warm browser server for --browser-server, or None to launch a browser as usual. """
+    if not pytestconfig.getoption("--browser-server"):
+        yield None
+        return
+    from tests.utils.browser_server import BrowserServer, BrowserServerError
+
+    if browser_name != "chromium":
+        logger.warning(f"⚠️ The browser server runs Chromium only, launching {browser_name} instead")
+        yield None
+        return
+
+    server = BrowserServer(
+        browser_type.executable_path,
+        launch_args=browser_type_launch_args.get("args", []),
+        headless=browser_type_launch_args.get("headless", True),
+    )
+    try:
+        endpoint = server.acquire()
+    except BrowserServerError as e:
+        logger.warning(f"⚠️ Could not start the browser server, launching a browser for this session: {e}")
+        yield None
+        return
+    yield endpoint
+    server.release()
+
+@pytest.fixture(scope="session")
+def launch_browser(launch_browser, browser_type, browser_server):
+    """ With a browser server, "launching" connects to it; closing the browser then only disconnects. """
+    if browser_server is None:
+        return launch_browser
+    return lambda **kwargs: browser_type.connect_over_cdp(browser_server)
+
+@pytest.fixture(scope="session")
+def auth_state(request, pytestconfig):
+    """ AuthStateStore holding a logged-in storage state, or None when --reuse-auth is off or login failed. """
+    if not pytestconfig.getoption("--reuse-auth"):
+        return None
+
+    from tests.utils.auth_state import AuthStateStore
+
+    secrets = request.getfixturevalue("secrets")
+    browser = request.getfixturevalue("browser")
+    user_data = secrets.get('user_data', {})
+    store = AuthStateStore()
+    try:
+        store.ensure(browser, secrets.get('login_url'), secrets.get('home_url_part'),
+                     user_data.get('id_number'), user_data.get('password'))
+        return store
+    except Exception as e:
+        logger.warning(f"⚠️ Could not prepare a saved login session, contexts will log in themselves: {e}")
+        return None
+
+@pytest.fixture(scope="session")
+def browser_context_args(browser_context_args, auth_state):
+    if auth_state is None:
+        return browser_context_args
+    return {**browser_context_args, "storage_state": str(auth_state.path)}
+
+@pytest.fixture(scope="session")
+def cdp_endpoint(cdp_port, browser_server):
+    if browser_server:
+        return browser_server
+    return f"http://127.0.0.1:{cdp_port}" if cdp_port else None
+
+@pytest.fixture(scope="session")
+def har_mode(pytestconfig):
+    """ HarMode for --record-har / --replay-har, or None for live runs. """
+    record_dir = pytestconfig.getoption("--record-har")
+    replay_dir = pytestconfig.getoption("--replay-har")
+    if record_dir and replay_dir:
+        pytest.exit("--record-har and --replay-har cannot be used together", returncode=4)
+    if not (record_dir or replay_dir):
+        return None
+    from pages.base_page import BasePage
+    from pages.link_checker import get_link_checker
+    from tests.utils.har_mode import HarMode
+
+    mode = HarMode(HarMode.REPLAY, replay_dir) if replay_dir else HarMode(HarMode.RECORD, record_dir)
+    # route.fetch() bypasses routing, so intercepted popups would go to the network (and not be recorded)
+    BasePage.POPUP_VERIFY_MODE = "load"
+    if mode.is_replay:
+        get_link_checker().offline = True
+    return mode
+
+@pytest.fixture(autouse=True)
+def har_routing(request, har_mode):
+    """ Routes a per-module test's context through its module's HAR. The full flow does this per module itself. """
+    if har_mode is None or "page" not in request.fixturenames:
+        return
+    stem = Path(str(request.node.fspath)).stem
+    module = HAR_MODULE_BY_TEST_FILE.get(stem, stem[:-len("_test")] if stem.endswith("_test") else stem)
+    if module:
+        har_mode.attach(request.getfixturevalue("context"), module)
+
+@pytest.fixture(scope="session")
+def fault_server():
+    """ Local fault-injecting HTTP server for offline link checker tests and benchmarks. """
+    from tests.utils.fault_server import FaultServer
+
+    with FaultServer() as server:
+        yield server
+
+@pytest.fixture
+def faults(fault_server):
+    """ The shared fault server with its request counters cleared. """
+    fault_server.reset()
+    return fault_server
+
+@pytest.fixture(scope="session")
+def benchmark_recorder(pytestconfig, har_mode):
+    """ Collects benchmark metrics and writes them (and optionally a new baseline) at the end of the session. """
+    from pages.tab_state import get_tab_state_store
+    from tests.utils.benchmark import BenchmarkRecorder
+
+    # Skipping unchanged tabs would make the timings meaningless
+    get_tab_state_store().force_full_run = True
+
+    recorder = BenchmarkRecorder(mode="replay" if har_mode is not None and har_mode.is_replay else "live")
+    yield recorder
+    recorder.save(pytestconfig.getoption("--benchmark-json"))
+    if pytestconfig.getoption("--benchmark-save-baseline"):
+        recorder.save(pytestconfig.getoption("--benchmark-baseline"))
+
+@pytest.fixture(scope="session")
+def benchmark_baseline(pytestconfig):
+    """ Baseline metrics, or None when saving a new baseline or none exists yet. """
+    if pytestconfig.getoption("--benchmark-save-baseline"):
+        return None
+    from tests.utils.benchmark import load_baseline
+
+    path = pytestconfig.getoption("--benchmark-baseline")
+    baseline = load_baseline(path)
+    if baseline is None:
+        logger.warning(f"⚠️ No benchmark baseline at {path}, record one with --benchmark-save-baseline.")
+    return baseline
+
+@pytest.fixture(scope="session")
+def benchmark_threshold(pytestconfig):
+    return pytestconfig.getoption("--benchmark-threshold")
+
+@pytest.fixture(scope="session")
+def link_inventory(pytestconfig):
+    """ Outbound links found by the crawler, written with their manifest diff at the end of the session. """
+    from pages.link_manifest import load_link_manifest
+    from tests.utils.link_inventory import LinkInventory
+
+    inventory = LinkInventory()
+    yield inventory
+    inventory.save(pytestconfig.getoption("--crawl-output"), load_link_manifest())
+
+@pytest.fixture(scope="session")
+def crawl_checker(har_mode):
+    """ A wider link checker for the crawler's hundreds of links; the per-host limit keeps it polite. """
+    from pages.host_policy import get_host_policy
+    from pages.link_checker import LinkChecker
+    from pages.url_status_cache import get_url_status_cache
+
+    checker = LinkChecker(
+        max_workers=int(os.environ.get("CRAWL_WORKERS", 32)),
+        cache=get_url_status_cache(),
+        host_policy=get_host_policy(),
+        offline=True if har_mode is not None and har_mode.is_replay else None,
+    )
+    yield checker
+    checker.close()
+
+@pytest.fixture(scope="session")
+def secrets():
+    from tests.utils.secrets_loader import load_secrets
+
+    data = load_secrets()
+    if not data:
+        logger.error("❌ Error: Could not load .env")
+        pytest.fail("❌ Error: Could not load .env")
+    return data
+
+def pytest_sessionfinish(session, exitstatus):
+    """ Persist link statuses so the next run can skip targets that are still fresh, export timing spans, then drain the Loki buffer. """
+    from pages.evidence import get_evidence_service
+    from pages.host_policy import get_host_policy
+    from pages.link_checker import get_link_checker
+    from pages.link_results import get_link_result_store
+    from pages.tab_state import get_tab_state_store
+    from pages.tracing import get_tracer
+    from pages.url_status_cache import get_url_status_cache
+    from pages.wait_stats import get_wait_stats
+    from tests.utils.loki_handler import LokiHandler
+    from tests.utils.run_history import get_run_history
+
+    get_url_status_cache().save()
+    get_tab_state_store().save()
+    get_host_policy().save()
+    get_evidence_service().flush()
+
+    for host, count in get_link_checker().host_guard.rejected.items():
+        logger.warning(f"🔌 {count} links on {host} were marked host unavailable without a request")
+
+    results_path = get_link_result_store().export_jsonl(log_dir / f"link_results_{log_filename.stem.replace('test_run_', '')}.jsonl")
+    if results_path:
+        logger.info(f"🔗 Link results exported to {results_path}")
+
+    get_run_history().record_run(
+        get_link_result_store().query(), get_tracer().spans(), get_wait_stats().summary(), exit_status=int(exitstatus)
+    )
+
+    trace_path = get_tracer().export_json(log_dir / f"trace_{log_filename.stem.replace('test_run_', '')}.json")
+    if trace_path:
+        logger.info(f"🧭 Timing spans exported to {trace_path}")
+
+    for handler in list(logger.handlers):
+        if isinstance(handler, LokiHandler):
+            handler.flush()
+            # Detached before closing, so nothing logged from here on reaches a closed handler
+            logger.removeHandler(handler)
+            handler.close()
+            if handler.dropped or handler.failed:
+                logger.warning(f"⚠️ Loki shipping: {handler.sent} sent, {handler.failed} failed, {handler.dropped} dropped")
+
+
+PLUGIN_IMPORT_SECONDS = time.perf_counter() - _import_started
@@ -0,0 +1,23 @@
+import time
+
+import pytest
+
+from pages.base_page import BasePage
+
+# Browser test against the local fault server: popups opened by real clicks, no live municipal hosts.
+
+
+@pytest.mark.parametrize("link_text", ["Blank target", "Window open"])
+def test_intercepted_popup_resolves_redirects(page, faults, monkeypatch, link_text):
+    monkeypatch.setattr(BasePage, "POPUP_VERIFY_MODE", "intercept")
+    base = BasePage(page)
+    page.goto(faults.url("/popups"))
+
+    started = time.monotonic()
+    url = base.resolve_popup_url(link_text, expected_url_part="/ok", timeout=5000)
+
+    assert url == faults.url("/ok")
+    assert base._verified_via == "popup_intercept"
+    # Resolved from the intercepted request, well before the timeout a missed interception would cost
+    assert time.monotonic() - started < 3
+    assert faults.hits["GET /redirect/2"] == 1
@@ -0,0 +1,36 @@
+import pytest
+
+from pages.resource_blocking import DEFAULT_BLOCKING_PROFILE, should_block
+
+# Offline: which requests a blocking profile aborts.
+
+FIRST_PARTY = {**DEFAULT_BLOCKING_PROFILE, "allow_hosts": ["rishonlezion.muni.il"]}
+LOGIN = {"resource_types": ["image", "media", "font"], "deny_hosts": [], "allow_hosts": ["google.com", "gstatic.com"]}
+
+
+@pytest.mark.parametrize("url, resource_type, profile, blocked", [
+    # Resource types
+    ("https://www.rishonlezion.muni.il/logo.png", "image", DEFAULT_BLOCKING_PROFILE, True),
+    ("https://www.rishonlezion.muni.il/font.woff2", "font", DEFAULT_BLOCKING_PROFILE, True),
+    ("https://www.rishonlezion.muni.il/site.css", "stylesheet", DEFAULT_BLOCKING_PROFILE, False),
+    ("https://www.rishonlezion.muni.il/app.js", "script", DEFAULT_BLOCKING_PROFILE, False),
+    ("https://www.rishonlezion.muni.il/", "document", DEFAULT_BLOCKING_PROFILE, False),
+    # Denied hosts match themselves and their subdomains only
+    ("https://www.google-analytics.com/analytics.js", "script", DEFAULT_BLOCKING_PROFILE, True),
+    ("https://GoogleTagManager.com/gtm.js", "script", DEFAULT_BLOCKING_PROFILE, True),
+    ("https://static.hotjar.com/c/hotjar.js", "script", DEFAULT_BLOCKING_PROFILE, True),
+    ("https://nothotjar.com/c.js", "script", DEFAULT_BLOCKING_PROFILE, False),
+    ("https://hotjar.com.example.org/c.js", "script", DEFAULT_BLOCKING_PROFILE, False),
+    # Allowlisted first-party hosts win over resource types and denied hosts
+    ("https://www.rishonlezion.muni.il/logo.png", "image", FIRST_PARTY, False),
+    ("https://rishonlezion.muni.il/font.woff2", "font", FIRST_PARTY, False),
+    ("https://cdn.example.org/logo.png", "image", FIRST_PARTY, True),
+    ("https://www.google.com/recaptcha/api.js", "script", LOGIN, False),
+    ("https://www.gstatic.com/recaptcha/logo.png", "image", LOGIN, False),
+    ("https://www.rishonlezion.muni.il/logo.png", "image", LOGIN, True),
+    # No profile: the module opted out
+    ("https://www.google-analytics.com/analytics.js", "script", None, False),
+    ("https://www.rishonlezion.muni.il/logo.png", "image", {}, False),
+])
+def test_should_block(url, resource_type, profile, blocked):
+    assert should_block(url, resource_type, profile) is blocked
@@ -0,0 +1,34 @@
+from pages.link_results import LinkResultStore
+from pages.tracing import Tracer
+from tests.utils.run_history import RunHistory
+
+# Offline: builds a small history in a temporary database and queries it.
+
+
+def record_run(path, status, latency):
+    history = RunHistory(path, enabled=True)
+    history.add_module_duration("water", 12.5)
+    store = LinkResultStore()
+    store.record("water", "tab_3", "כשרות", "https://docs.example/x.pdf", status, status == 206, "document", latency)
+    store.record("water", "tab_3", "בקשה", None, "not_found", False, "attributes", 0.0)
+    tracer = Tracer()
+    with tracer.span("tab_switch", module="water", tab="tab_3"):
+        pass
+    return history.record_run(store.query(), tracer.spans(), {"water": {"fixed_sleep": {"count": 1, "seconds": 0.5}}}, 0)
+
+
+def test_run_history_queries(tmp_path):
+    path = tmp_path / "history.db"
+    assert [record_run(path, status, latency) for status, latency in [(206, 0.2), (404, 0.4), (404, 1.0)]] == [1, 2, 3]
+    history = RunHistory(path)
+
+    # Verification failures are not broken links; the HTTP failure shows up in both of the last two runs
+    assert history.broken_links(runs=2) == [("water", "כשרות", "https://docs.example/x.pdf", 2, "404")]
+    assert history.broken_links(runs=1)[0][3] == 1
+    assert history.host_latency_p95() == [("docs.example", 3, 0.4, 1.0)]
+    assert [(module, tab, runs) for module, tab, runs, _, _ in history.slowest_tabs()] == [("water", "tab_3", 3)]
+
+
+def test_empty_run_is_not_recorded(tmp_path):
+    assert RunHistory(tmp_path / "history.db", enabled=True).record_run([], [], {}) is None
+    assert not (tmp_path / "history.db").exists()
@@ -0,0 +1,60 @@
+import time
+
+from pages import base_page
+from pages.business_page import BusinessLicensePage
+from pages.link_results import LinkResultStore
+from pages.tab_state import TabStateStore
+from pages.url_status_cache import UrlStatusCache
+
+# Offline: when a tab may be skipped as unchanged.
+
+
+def make_store(tmp_path, max_age=None):
+    cache = UrlStatusCache(tmp_path / "url_status.json")
+    store = TabStateStore(tmp_path / "tab_hashes.json", force_full_run=False, url_cache=cache)
+    if max_age is not None:
+        store.max_age = max_age
+    return store, cache
+
+
+def test_http_checked_targets_must_stay_fresh(tmp_path):
+    store, cache = make_store(tmp_path)
+    store.remember("business", "tab_1", "hash", True, ["https://a.example/form", "https://b.example/popup"])
+
+    assert store.unchanged_entry("business", "tab_1", "hash") is None
+    cache.put("https://a.example/form", True, 200)
+    assert store.unchanged_entry("business", "tab_1", "hash") is None
+    cache.put("https://b.example/popup", True, 200)
+    assert store.unchanged_entry("business", "tab_1", "hash") is not None
+    assert store.unchanged_entry("business", "tab_1", "other hash") is None
+
+
+def test_old_verifications_expire(tmp_path):
+    store, _ = make_store(tmp_path, max_age=60)
+    store.remember("water", "tab_2", "hash", True, [])
+    assert store.unchanged_entry("water", "tab_2", "hash") is not None
+
+    store._entries[store.key("water", "tab_2")]["verified_at"] = time.time() - 61
+    assert store.unchanged_entry("water", "tab_2", "hash") is None
+
+
+def test_popup_and_attribute_tab_is_skipped_on_its_second_run(tmp_path, monkeypatch):
+    store, _ = make_store(tmp_path)
+    monkeypatch.setattr(base_page, "get_tab_state_store", lambda: store)
+    monkeypatch.setattr(base_page, "get_link_result_store", lambda: LinkResultStore())
+    links = BusinessLicensePage.TAB_1_LINKS
+    harvested = [{"text": text, "href": f"https://{expected}", "onclick": "", "visible": True} for text, expected in links.items()]
+
+    class FakePage:
+        def wait_for_function(self, *args, **kwargs):
+            pass
+
+        def evaluate(self, *args):
+            return harvested
+
+    page = BusinessLicensePage(FakePage(), "https://business.example")
+    assert set(page.verify_links(links, tab="tab_1")) == set(links)
+    assert not store.skipped
+
+    assert page.verify_links(links, tab="tab_1") == {}
+    assert [(module, tab) for module, tab, _ in store.skipped] == [("business", "tab_1")]
@@ -0,0 +1,65 @@
+import json
+import threading
+
+from pages.tracing import Tracer
+
+# Offline: span nesting, explicit parents across threads and the OTLP/JSON export.
+
+
+def test_nested_spans_export_their_parent_ids(tmp_path):
+    tracer = Tracer()
+    with tracer.span("module", module="Water") as root:
+        with tracer.span("tab", tab="bills") as tab:
+            with tracer.span("harvest") as harvest:
+                assert tracer.current() is harvest
+
+            def check():
+                assert tracer.current() is None  # the stack is per thread
+                with tracer.span("http_check", parent=tab, url="https://example.org") as span:
+                    assert tracer.current() is span
+
+            worker = threading.Thread(target=check)
+            worker.start()
+            worker.join()
+        try:
+            with tracer.span("popup", tab=None):
+                raise TimeoutError("no popup")
+        except TimeoutError:
+            pass
+    assert tracer.current() is None
+
+    exported = json.loads(tracer.export_json(tmp_path / "traces.json").read_text(encoding="utf-8"))
+
+    (resource_spans,) = exported["resourceSpans"]
+    assert resource_spans["resource"]["attributes"] == [
+        {"key": "service.name", "value": {"stringValue": Tracer.SERVICE_NAME}}]
+    (scope_spans,) = resource_spans["scopeSpans"]
+    assert scope_spans["scope"] == {"name": "pages.tracing"}
+    spans = {span["name"]: span for span in scope_spans["spans"]}
+    assert set(spans) == {"module", "tab", "harvest", "http_check", "popup"}
+
+    assert spans["module"]["parentSpanId"] == ""
+    assert spans["module"]["spanId"] == root.span_id
+    assert spans["tab"]["parentSpanId"] == root.span_id
+    assert spans["harvest"]["parentSpanId"] == tab.span_id == spans["tab"]["spanId"]
+    assert spans["http_check"]["parentSpanId"] == tab.span_id
+    assert spans["popup"]["parentSpanId"] == root.span_id
+    assert {span["traceId"] for span in spans.values()} == {tracer.trace_id}
+
+    attributes = {item["key"]: item["value"] for item in spans["http_check"]["attributes"]}
+    assert attributes == {"url": {"stringValue": "https://example.org"},
+                          "module": {"stringValue": "Water"}, "tab": {"stringValue": "bills"}}
+    assert spans["harvest"]["status"] == {"code": 1}
+    assert spans["popup"]["status"] == {"code": 2, "message": "no popup"}
+    for span in spans.values():
+        assert span["kind"] == 1
+        assert int(span["startTimeUnixNano"]) <= int(span["endTimeUnixNano"])
+
+
+def test_a_disabled_tracer_records_and_exports_nothing(tmp_path):
+    tracer = Tracer(enabled=False)
+    with tracer.span("module") as span:
+        assert span is None
+
+    assert tracer.export_json(tmp_path / "traces.json") is None
+    assert not (tmp_path / "traces.json").exists()
@@ -0,0 +1,102 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pages.url_status_cache import UrlStatusCache
+
+# Offline: freshness, single-flight fetches and persistence of the URL status cache.
+
+URL = "https://example.org/forms/form.pdf"
+
+
+def age(cache, url, seconds):
+    with cache._lock:
+        cache._load()[cache.cache_key(url)]["checked_at"] = time.time() - seconds
+
+
+@pytest.mark.parametrize("status, ttl_name", [
+    (200, "ttl_ok"),
+    (206, "ttl_success"),
+    (301, "ttl_success"),
+    (404, "ttl_failure"),
+    (503, "ttl_failure"),
+    ("Read timed out.", "ttl_failure"),
+])
+def test_entries_expire_after_the_ttl_of_their_status_class(tmp_path, status, ttl_name):
+    cache = UrlStatusCache(tmp_path / "url_status.json")
+    ttl = getattr(cache, ttl_name)
+    cache.put(URL, status == 200, status)
+
+    age(cache, URL, ttl - 5)
+    assert cache.get(URL)["status"] == status
+    age(cache, URL, ttl + 5)
+    assert cache.get(URL) is None
+    assert cache.get(URL, ignore_ttl=True)["status"] == status
+
+
+def test_concurrent_misses_share_one_fetch(tmp_path):
+    cache = UrlStatusCache(tmp_path / "url_status.json")
+    calls, release = [], threading.Event()
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return True, 200
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(cache.get_or_fetch, URL, fetch) for _ in range(8)]
+        while not calls or len(cache._inflight) != 1:
+            time.sleep(0.01)
+        time.sleep(0.1)  # let the other callers reach the in-flight fetch
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert len(calls) == 1
+    assert sorted(results) == [(True, 200, False)] + [(True, 200, True)] * 7
+    assert cache.get_or_fetch(URL, fetch) == (True, 200, True)
+    assert len(calls) == 1
+
+
+def test_a_failed_fetch_reaches_every_waiter_and_is_not_cached(tmp_path):
+    cache = UrlStatusCache(tmp_path / "url_status.json")
+    calls, release = [], threading.Event()
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        raise ConnectionError("host unavailable")
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(cache.get_or_fetch, URL, fetch) for _ in range(4)]
+        while not calls:
+            time.sleep(0.01)
+        time.sleep(0.1)
+        release.set()
+        errors = [future.exception() for future in futures]
+
+    assert len(calls) == 1
+    assert all(isinstance(error, ConnectionError) for error in errors)
+    assert cache.get(URL) is None and not cache._inflight
+
+
+def test_save_merges_with_the_file_on_disk(tmp_path):
+    path = tmp_path / "url_status.json"
+    now = time.time()
+    path.write_text(json.dumps({
+        "https://example.org/other": {"ok": True, "status": 200, "checked_at": now - 60},
+        "https://example.org/newer-on-disk": {"ok": False, "status": 404, "checked_at": now + 60},
+    }), encoding="utf-8")
+
+    cache = UrlStatusCache(path)
+    cache.put("https://example.org/newer-on-disk", True, 200)
+    cache.put(URL, True, 200)
+    cache.save()
+
+    saved = json.loads(path.read_text(encoding="utf-8"))
+    assert set(saved) == {"https://example.org/other", "https://example.org/newer-on-disk", URL}
+    assert saved["https://example.org/newer-on-disk"]["status"] == 404  # newest wins
+    assert saved[URL]["status"] == 200
+    assert not list(tmp_path.glob("*.tmp"))
@@ -0,0 +1,76 @@
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+from pages.login_page import LoginPage
+
+logger = logging.getLogger("SystemFlowLogger")
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+
+class AuthStateStore:
+    """
+    Logs in once, saves Playwright's storage_state and hands it to every new context,
+    in this run and later ones. Logs in again only when the saved session looks expired.
+    """
+
+    DEFAULT_PATH = PROJECT_ROOT / ".auth" / "storage_state.json"
+    DEFAULT_MAX_AGE = 8 * 60 * 60  # seconds
+
+    def __init__(self, path=None, max_age=None):
+        self.path = Path(path or os.getenv("AUTH_STATE_PATH") or self.DEFAULT_PATH)
+        self.max_age = max_age or int(os.getenv("AUTH_STATE_MAX_AGE", self.DEFAULT_MAX_AGE))
+
+    def is_fresh(self):
+        """
+        The saved state is usable if it is younger than max_age and none of its cookies has expired.
+        """
+        try:
+            age = time.time() - self.path.stat().st_mtime
+            state = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return False
+
+        if age > self.max_age:
+            return False
+
+        cookies = state.get("cookies", [])
+        if not cookies and not state.get("origins"):
+            return False
+
+        now = time.time()
+        return not any(0 < cookie.get("expires", -1) < now for cookie in cookies)
+
+    def invalidate(self):
+        try:
+            self.path.unlink()
+            logger.info("🔑 Saved login session expired, it will be renewed.")
+        except FileNotFoundError:
+            pass
+
+    def save(self, context):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        context.storage_state(path=str(self.path))
+        logger.info(f"🔑 Login session saved to {self.path}")
+
+    def ensure(self, browser, login_url, home_url_part, user_id, password):
+        """
+        Returns the path of a fresh storage state, logging in through the UI only if needed.
+        """
+        if self.is_fresh():
+            logger.info(f"🔑 Reusing saved login session: {self.path}")
+            return str(self.path)
+
+        logger.info("🔑 No valid saved login session, logging in once for this run...")
+        context = browser.new_context()
+        try:
+            login_page = LoginPage(context.new_page(), login_url)
+            login_page.login_with_password(user_id, password)
+            login_page.wait_for_successful_login(home_url_part)
+            self.save(context)
+        finally:
+            context.close()
+        return str(self.path)
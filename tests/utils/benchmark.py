@@ -0,0 +1,83 @@
+import json
+import logging
+import platform
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+logger = logging.getLogger("SystemFlowLogger")
+
+
+class BenchmarkRecorder:
+    """
+    Collects flat benchmark metrics ("<module>.<metric>") for the page-object hot paths:
+      <module>.navigation               seconds to open the module page
+      <module>.tab.<tab>                seconds to switch to a tab
+      <module>.links.<tab>.per_link     seconds per verified link on a tab
+      <module>.fixed_sleeps             fixed delays taken (counted, any increase is a regression)
+      <module>.popups                   popups opened (counted, any increase is a regression)
+    """
+
+    COUNTER_SUFFIXES = (".fixed_sleeps", ".popups")
+
+    def __init__(self, mode="live"):
+        self.mode = mode
+        self.metrics = {}
+
+    @contextmanager
+    def measure(self, metric, items=1):
+        """
+        Times the block and stores seconds per item under `metric`.
+        """
+        started = time.monotonic()
+        yield
+        self.metrics[metric] = (time.monotonic() - started) / max(items, 1)
+
+    def count(self, metric, value):
+        self.metrics[metric] = value
+
+    def module_metrics(self, module):
+        prefix = f"{module}."
+        return {name: value for name, value in self.metrics.items() if name.startswith(prefix)}
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        report = {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "mode": self.mode,
+            "host": platform.node(),
+            "metrics": dict(sorted(self.metrics.items())),
+        }
+        path.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+        logger.info(f"📊 Benchmark results written to {path}")
+
+
+def load_baseline(path):
+    """
+    Returns the baseline's metrics, or None when no baseline has been saved yet.
+    """
+    try:
+        return json.loads(Path(path).read_text(encoding="utf-8"))["metrics"]
+    except FileNotFoundError:
+        return None
+
+
+def compare_to_baseline(current, baseline, threshold, min_delta=0.05):
+    """
+    Returns a list of regression messages.
+    Timings regress when they exceed the baseline by more than `threshold` (a fraction) and `min_delta` seconds;
+    counters (fixed sleeps, popups) regress on any increase.
+    """
+    regressions = []
+    for metric, value in sorted(current.items()):
+        if metric not in baseline:
+            continue
+        base = baseline[metric]
+        if metric.endswith(BenchmarkRecorder.COUNTER_SUFFIXES):
+            if value > base:
+                regressions.append(f"{metric}: {base} -> {value}")
+        elif value > base * (1 + threshold) and value - base > min_delta:
+            regressions.append(f"{metric}: {base:.3f}s -> {value:.3f}s (+{(value / base - 1) * 100 if base else float('inf'):.0f}%)")
+    return regressions
@@ -0,0 +1,310 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import signal
+import subprocess
+import time
+import urllib.request
+from contextlib import contextmanager
+from pathlib import Path
+
+logger = logging.getLogger("SystemFlowLogger")
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+
+class BrowserServerError(RuntimeError):
+    pass
+
+
+class BrowserServer:
+    """
+    A Chromium kept running between pytest sessions, so scheduled runs and local iterations skip the cold launch.
+    Sessions connect to its DevTools websocket endpoint instead of launching their own browser.
+
+    The server's pid, endpoint and the sessions served so far are kept in a state file under state_dir.
+    It is recycled (stopped and launched again) once it has served BROWSER_SERVER_MAX_SESSIONS sessions
+    (default 20) or its processes use more than BROWSER_SERVER_MAX_MEMORY_MB (default 1500), but never while
+    another session is still connected. Only the process tree it launched itself is ever stopped.
+    """
+
+    DEFAULT_STATE_DIR = PROJECT_ROOT / ".cache" / "browser_server"
+    DEFAULT_MAX_SESSIONS = 20
+    DEFAULT_MAX_MEMORY_MB = 1500
+    STARTUP_TIMEOUT = 30  # seconds
+    LOCK_TIMEOUT = 60  # seconds; an older lock file was left by a killed session
+
+    def __init__(self, executable_path, launch_args=(), headless=True, state_dir=None,
+                 max_sessions=None, max_memory_mb=None):
+        self.executable_path = executable_path
+        self.launch_args = list(launch_args)
+        self.headless = headless
+        self.state_dir = Path(state_dir or os.getenv("BROWSER_SERVER_DIR") or self.DEFAULT_STATE_DIR)
+        self.max_sessions = max_sessions or int(os.getenv("BROWSER_SERVER_MAX_SESSIONS", self.DEFAULT_MAX_SESSIONS))
+        self.max_memory_mb = max_memory_mb or int(os.getenv("BROWSER_SERVER_MAX_MEMORY_MB", self.DEFAULT_MAX_MEMORY_MB))
+        self.state_path = self.state_dir / "state.json"
+        self.lock_path = self.state_dir / "state.lock"
+        self.user_data_dir = self.state_dir / "profile"
+
+    def acquire(self):
+        """
+        Registers this session with a running server, launching or recycling it first when needed.
+        Returns the websocket endpoint to connect to.
+        """
+        with self._locked():
+            state = self._read_state()
+            if state is not None and not self._owns(state["pid"]):
+                logger.info(f"🧹 Browser server {state['pid']} is gone, launching a new one")
+                state = None
+            if state is not None:
+                state["clients"] = [pid for pid in state["clients"] if _is_alive(pid)]
+                reason = self._recycle_reason(state)
+                if reason and not state["clients"]:
+                    logger.info(f"♻️ Recycling browser server {state['pid']}: {reason}")
+                    self._terminate(state["pid"])
+                    state = None
+            if state is None:
+                state = self._launch()
+
+            state["sessions"] += 1
+            state["clients"].append(os.getpid())
+            self._write_state(state)
+        logger.info(f"🌐 Using browser server {state['pid']} (session {state['sessions']}): {state['ws_endpoint']}")
+        return state["ws_endpoint"]
+
+    def release(self):
+        """ Unregisters this session; the server keeps running for the next one. """
+        with self._locked():
+            state = self._read_state()
+            if state is None:
+                return
+            state["clients"] = [pid for pid in state["clients"] if pid != os.getpid() and _is_alive(pid)]
+            self._write_state(state)
+
+    def stop(self):
+        """ Stops the server this state directory owns, if it is running. Returns whether one was stopped. """
+        with self._locked():
+            state = self._read_state()
+            stopped = state is not None and self._owns(state["pid"])
+            if stopped:
+                self._terminate(state["pid"])
+            self.state_path.unlink(missing_ok=True)
+        return stopped
+
+    def status(self):
+        """ The state of the running server with its current memory use, or None. """
+        state = self._read_state()
+        if state is None or not self._owns(state["pid"]):
+            return None
+        return {**state, "memory_mb": _tree_memory_mb(state["pid"])}
+
+    def _recycle_reason(self, state):
+        if state["sessions"] >= self.max_sessions:
+            return f"served {state['sessions']} sessions"
+        memory_mb = _tree_memory_mb(state["pid"])
+        if memory_mb is not None and memory_mb > self.max_memory_mb:
+            return f"using {memory_mb:.0f} MB"
+        return None
+
+    def _launch(self):
+        self.user_data_dir.mkdir(parents=True, exist_ok=True)
+        port_file = self.user_data_dir / "DevToolsActivePort"
+        port_file.unlink(missing_ok=True)
+        command = [
+            self.executable_path,
+            "--remote-debugging-port=0",
+            f"--user-data-dir={self.user_data_dir}",
+            "--no-first-run",
+            "--no-default-browser-check",
+            *(["--headless=new"] if self.headless else []),
+            *self.launch_args,
+            "about:blank",
+        ]
+        # Its own process group (or Windows process group), so stopping it never reaches the session that launched it
+        if platform.system() == "Windows":
+            process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                       creationflags=subprocess.CREATE_NEW_PROCESS_GROUP)
+        else:
+            process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                       start_new_session=True)
+
+        deadline = time.monotonic() + self.STARTUP_TIMEOUT
+        while not port_file.exists() or len(port_file.read_text().splitlines()) < 2:
+            if process.poll() is not None:
+                raise BrowserServerError(f"Browser server exited with code {process.returncode} during startup")
+            if time.monotonic() > deadline:
+                self._terminate(process.pid)
+                raise BrowserServerError(f"Browser server did not open a DevTools port within {self.STARTUP_TIMEOUT}s")
+            time.sleep(0.1)
+        port, path = port_file.read_text().splitlines()[:2]
+        ws_endpoint = f"ws://127.0.0.1:{port}{path}"
+
+        logger.info(f"🚀 Launched browser server {process.pid} on port {port}")
+        return {
+            "pid": process.pid,
+            "ws_endpoint": ws_endpoint,
+            "started_at": time.time(),
+            "sessions": 0,
+            "clients": [],
+        }
+
+    def _owns(self, pid):
+        """
+        Whether `pid` is still the browser launched with this state directory's profile, not a process
+        that reused its pid. Where the command line cannot be read, the DevTools endpoint must still answer.
+        """
+        if not _is_alive(pid):
+            return False
+        cmdline = _cmdline(pid)
+        if cmdline is not None:
+            return f"--user-data-dir={self.user_data_dir}" in cmdline
+        state = self._read_state()
+        return state is not None and _endpoint_answers(state["ws_endpoint"])
+
+    def _terminate(self, pid):
+        if platform.system() == "Windows":
+            subprocess.run(["taskkill", "/f", "/t", "/pid", str(pid)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            return
+        try:
+            os.killpg(pid, signal.SIGTERM)
+        except (ProcessLookupError, PermissionError):
+            return
+        deadline = time.monotonic() + 5
+        while _is_alive(pid) and time.monotonic() < deadline:
+            time.sleep(0.1)
+        if _is_alive(pid):
+            try:
+                os.killpg(pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+
+    @contextmanager
+    def _locked(self):
+        """ Serializes sessions that start or finish at the same time on the state file. """
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        deadline = time.monotonic() + self.LOCK_TIMEOUT
+        while True:
+            try:
+                fd = os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.close(fd)
+                break
+            except FileExistsError:
+                try:
+                    stale = time.time() - self.lock_path.stat().st_mtime > self.LOCK_TIMEOUT
+                except FileNotFoundError:
+                    continue
+                if stale or time.monotonic() > deadline:
+                    logger.warning(f"⚠️ Taking over stale browser server lock {self.lock_path}")
+                    self.lock_path.unlink(missing_ok=True)
+                    continue
+                time.sleep(0.1)
+        try:
+            yield
+        finally:
+            self.lock_path.unlink(missing_ok=True)
+
+    def _read_state(self):
+        try:
+            return json.loads(self.state_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Ignoring unreadable browser server state {self.state_path}: {e}")
+            return None
+
+    def _write_state(self, state):
+        tmp_path = self.state_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(state, indent=1), encoding="utf-8")
+        os.replace(tmp_path, self.state_path)
+
+
+def _is_alive(pid):
+    if platform.system() == "Windows":
+        result = subprocess.run(["tasklist", "/fi", f"PID eq {pid}", "/nh"], capture_output=True, text=True)
+        return str(pid) in result.stdout
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    # A terminated child of this process stays a zombie until reaped
+    try:
+        return Path(f"/proc/{pid}/stat").read_text().split(") ", 1)[1][0] != "Z"
+    except (OSError, IndexError):
+        return True
+
+
+def _cmdline(pid):
+    """ The process's command line on Linux, or None where /proc is not available. """
+    try:
+        return Path(f"/proc/{pid}/cmdline").read_bytes().replace(b"\0", b" ").decode(errors="replace")
+    except OSError:
+        return None
+
+
+def _tree_memory_mb(root_pid):
+    """
+    Resident memory of `root_pid` and all its descendants (renderers, GPU and utility processes), in MB.
+    Read from /proc, so None on other platforms.
+    """
+    proc = Path("/proc")
+    if not proc.is_dir():
+        return None
+    children = {}
+    rss_pages = {}
+    for entry in proc.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+            rss_pages[int(entry.name)] = int((entry / "statm").read_text().split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        parent = int(stat.rsplit(")", 1)[1].split()[1])
+        children.setdefault(parent, []).append(int(entry.name))
+
+    total, pending = 0, [root_pid]
+    while pending:
+        pid = pending.pop()
+        total += rss_pages.get(pid, 0)
+        pending.extend(children.get(pid, ()))
+    return total * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def _endpoint_answers(ws_endpoint):
+    port = ws_endpoint.split(":")[2].split("/")[0]
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/json/version", timeout=2):
+            return True
+    except OSError:
+        return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or stop the warm browser server used with --browser-server.")
+    parser.add_argument("command", choices=["status", "stop", "reset"],
+                        help="reset also deletes the server's browser profile")
+    args = parser.parse_args(argv)
+
+    server = BrowserServer(executable_path=None)
+    if args.command == "status":
+        status = server.status()
+        if status is None:
+            print("No browser server running")
+            return
+        memory = "unknown memory" if status["memory_mb"] is None else f"{status['memory_mb']:.0f} MB"
+        print(f"pid {status['pid']}, {status['sessions']} sessions, {len(status['clients'])} connected, "
+              f"up {time.time() - status['started_at']:.0f}s, {memory}")
+        print(status["ws_endpoint"])
+        return
+    print("Stopped the browser server" if server.stop() else "No browser server running")
+    if args.command == "reset":
+        shutil.rmtree(server.user_data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
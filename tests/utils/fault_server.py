@@ -0,0 +1,180 @@
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+POPUPS_PAGE = b"""<!doctype html>
+<html><body>
+<a href="/redirect/2" target="_blank">Blank target</a>
+<a href="#" onclick="window.open('/redirect/2'); return false;">Window open</a>
+</body></html>
+"""
+
+
+class FaultServer:
+    """
+    Local stand-in for link targets, serving fault scenarios by path:
+      /ok                      200
+      /slow?delay=S            waits S seconds before the first byte, then 200
+      /head405                 HEAD -> 405, GET -> 200
+      /redirect/N              N-hop redirect chain ending at /ok
+      /loop                    redirect loop
+      /status/CODE             any status code (404, 500, ...)
+      /pdf?size=BYTES&head=405 large PDF body (default 50 MB), streamed; `head` overrides the HEAD status
+      /pdf/NAME.pdf?range=1    the same PDF under a document-like path; with `range=1`, Range requests get a 206
+      /soft404/NAME.pdf        200 text/html error page where a document was expected
+      /flaky?fail=N&key=K      503 for the first N requests per key, 200 afterwards
+      /hang                    accepts the request and never answers
+      /popups                  HTML page whose links open /redirect/2 in a popup (target=_blank and window.open)
+    Every request is counted in `hits` as "METHOD /path".
+    """
+
+    DEFAULT_PDF_SIZE = 50 * 1024 * 1024
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self.hits = Counter()
+        self.flaky_hits = Counter()
+        self._hits_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, path):
+        return f"{self.base_url}{path}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fault-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopping.set()  # releases /hang handlers
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def reset(self):
+        with self._hits_lock:
+            self.hits.clear()
+            self.flaky_hits.clear()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _record(self, method, path):
+        with self._hits_lock:
+            self.hits[f"{method} {path}"] += 1
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_HEAD(self):
+                self._dispatch(send_body=False)
+
+            def do_GET(self):
+                self._dispatch(send_body=True)
+
+            def _dispatch(self, send_body):
+                parts = urlsplit(self.path)
+                path, query = parts.path, parse_qs(parts.query)
+                server._record(self.command, path)
+
+                if path == "/ok":
+                    self._respond(200, b"ok", send_body=send_body)
+                elif path == "/slow":
+                    time.sleep(float(query.get("delay", ["2"])[0]))
+                    self._respond(200, b"slow ok", send_body=send_body)
+                elif path == "/head405":
+                    self._respond(405 if self.command == "HEAD" else 200, b"ok", send_body=send_body)
+                elif path.startswith("/redirect/"):
+                    hops = int(path.rsplit("/", 1)[1])
+                    self._redirect("/ok" if hops <= 1 else f"/redirect/{hops - 1}")
+                elif path == "/loop":
+                    self._redirect("/loop")
+                elif path.startswith("/status/"):
+                    self._respond(int(path.rsplit("/", 1)[1]), b"status", send_body=send_body)
+                elif path == "/pdf" or path.startswith("/pdf/"):
+                    head_status = int(query.get("head", ["200"])[0])
+                    if self.command == "HEAD" and head_status != 200:
+                        self._respond(head_status, b"", send_body=False)
+                    else:
+                        self._send_pdf(int(query.get("size", [server.DEFAULT_PDF_SIZE])[0]), send_body,
+                                       honor_range=query.get("range") == ["1"])
+                elif path.startswith("/soft404/"):
+                    self._respond(200, b"<html><body>Page not found</body></html>", "text/html", send_body=send_body)
+                elif path == "/flaky":
+                    key = query.get("key", [""])[0]
+                    with server._hits_lock:
+                        server.flaky_hits[key] += 1
+                        failing = server.flaky_hits[key] <= int(query.get("fail", ["1"])[0])
+                    self._respond(503 if failing else 200, b"flaky", send_body=send_body)
+                elif path == "/popups":
+                    self._respond(200, POPUPS_PAGE, "text/html; charset=utf-8", send_body=send_body)
+                elif path == "/hang":
+                    server._stopping.wait()
+                else:
+                    self._respond(404, b"unknown scenario", send_body=send_body)
+
+            def _respond(self, status, body, content_type="text/plain", send_body=True):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if send_body:
+                    self.wfile.write(body)
+
+            def _redirect(self, location):
+                self.send_response(302)
+                self.send_header("Location", location)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def _send_pdf(self, size, send_body, honor_range=False):
+                requested = self.headers.get("Range", "")
+                if honor_range and requested.startswith("bytes=0-"):
+                    length = min(size, int(requested[len("bytes=0-"):]) + 1)
+                    body = (b"%PDF-1.7\n" + b"0" * length)[:length]
+                    self.send_response(206)
+                    self.send_header("Content-Type", "application/pdf")
+                    self.send_header("Content-Range", f"bytes 0-{length - 1}/{size}")
+                    self.send_header("Content-Length", str(length))
+                    self.end_headers()
+                    if send_body:
+                        self.wfile.write(body)
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/pdf")
+                self.send_header("Content-Length", str(size))
+                self.end_headers()
+                if not send_body:
+                    return
+                header = b"%PDF-1.7\n"
+                chunk = b"0" * server.CHUNK_SIZE
+                try:
+                    self.wfile.write(header)
+                    remaining = size - len(header)
+                    while remaining > 0 and not server._stopping.is_set():
+                        self.wfile.write(chunk[:remaining])
+                        remaining -= len(chunk)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client closed the stream early, which is what a link check should do
+                    pass
+
+        return Handler
@@ -0,0 +1,49 @@
+import logging
+import os
+import re
+from pathlib import Path
+
+logger = logging.getLogger("SystemFlowLogger")
+
+
+class HarMode:
+    """
+    Records each module's traffic to <directory>/<module>.har, or serves it back with route_from_har
+    so module flows run without network. One HAR per browser context, so every module needs its own context.
+    """
+
+    RECORD = "record"
+    REPLAY = "replay"
+
+    def __init__(self, mode, directory, url_pattern=None):
+        self.mode = mode
+        self.directory = Path(directory)
+        # Optional regex limiting what is recorded/replayed; everything else is aborted on replay
+        pattern = url_pattern or os.getenv("HAR_URL_PATTERN")
+        self.url_pattern = re.compile(pattern) if pattern else None
+
+    @property
+    def is_replay(self):
+        return self.mode == self.REPLAY
+
+    def path_for(self, module):
+        return self.directory / f"{module}.har"
+
+    def attach(self, context, module):
+        """
+        Routes `context` through the module's HAR. When recording, the file is written on context.close().
+        """
+        path = self.path_for(module)
+        if self.is_replay:
+            if not path.exists():
+                raise FileNotFoundError(f"No recorded HAR for '{module}': {path} (record it with --record-har)")
+            if self.url_pattern is not None:
+                # Registered first, so it only sees requests the HAR route does not handle
+                context.route("**/*", lambda route: route.abort())
+            context.route_from_har(str(path), url=self.url_pattern, not_found="abort")
+            logger.info(f"📼 Replaying {module} traffic from {path}")
+        else:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            context.route_from_har(str(path), url=self.url_pattern, update=True,
+                                   update_content="embed", update_mode="minimal")
+            logger.info(f"📼 Recording {module} traffic to {path}")
@@ -0,0 +1,48 @@
+import sys
+import time
+
+import pytest
+
+
+class ImportProfile:
+    """
+    Startup profile for --import-profile: how long the plugin's own imports took, and for every test module
+    how long its import and its collection took and how many modules its import pulled in.
+    Reported slowest first in the terminal summary.
+    """
+
+    def __init__(self, plugin_import_seconds):
+        self.plugin_import_seconds = plugin_import_seconds
+        self.rows = []  # (test module, import seconds, collection seconds, modules imported)
+        self.started = time.perf_counter()
+        self.collection_seconds = None
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_make_collect_report(self, collector):
+        if not isinstance(collector, pytest.Module):
+            yield
+            return
+        loaded = len(sys.modules)
+        started = time.perf_counter()
+        try:
+            collector.obj  # imports the module; a failing import is reported by the collection that follows
+        except Exception:
+            pass
+        imported = time.perf_counter()
+        yield
+        self.rows.append((collector.nodeid, imported - started, time.perf_counter() - imported, len(sys.modules) - loaded))
+
+    def pytest_collection_finish(self, session):
+        self.collection_seconds = time.perf_counter() - self.started
+
+    def pytest_terminal_summary(self, terminalreporter):
+        write = terminalreporter.write_line
+        terminalreporter.write_sep("=", "import profile")
+        write(f"plugin imports: {self.plugin_import_seconds * 1000:.0f} ms")
+        write(f"{'import':>9}{'collect':>9}{'modules':>9}  test module")
+        for nodeid, import_seconds, collect_seconds, modules in sorted(self.rows, key=lambda row: -(row[1] + row[2])):
+            write(f"{import_seconds * 1000:>7.0f}ms{collect_seconds * 1000:>7.0f}ms{modules:>9}  {nodeid}")
+        write(f"{sum(row[1] for row in self.rows) * 1000:>7.0f}ms{sum(row[2] for row in self.rows) * 1000:>7.0f}ms"
+              f"{sum(row[3] for row in self.rows):>9}  total, {len(self.rows)} modules")
+        if self.collection_seconds is not None:
+            write(f"collection: {self.collection_seconds * 1000:.0f} ms")
@@ -0,0 +1,116 @@
+import json
+import logging
+import re
+import threading
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import unquote
+
+from pages.link_manifest import get_text_matcher
+
+logger = logging.getLogger("SystemFlowLogger")
+
+URL_IN_SCRIPT = re.compile(r"https?://[^\s'\"\\)]+")
+
+
+def outbound_url(link):
+    """
+    The absolute URL a harvested link leads to: its href, or the first URL inside its onclick handler.
+    """
+    href = link.get("href") or ""
+    if href.startswith(("http://", "https://")):
+        return href
+    match = URL_IN_SCRIPT.search(link.get("onclick") or "")
+    return match.group(0) if match else None
+
+
+def _clean(url):
+    return unquote(url).replace("https://", "").replace("http://", "").strip()
+
+
+class LinkInventory:
+    """
+    Every outbound link the crawler found, per module, deduplicated by URL, with its HTTP status.
+    diff() compares it with the link manifest:
+      new        - links on the site that no manifest entry covers
+      removed    - manifest entries whose text is no longer on the module's pages
+      unexpected - manifest entries whose text is present but no longer leads to the expected URL
+    """
+
+    def __init__(self):
+        self.links = {}        # module -> {url: {"text", "url", "tabs", "visible", "ok", "status"}}
+        self.texts = {}        # module -> set of every harvested link text (outbound or not)
+        self._lock = threading.Lock()
+
+    def add(self, module, tab, harvested):
+        with self._lock:
+            module_links = self.links.setdefault(module, {})
+            module_texts = self.texts.setdefault(module, set())
+            for link in harvested:
+                if link["text"]:
+                    module_texts.add(link["text"])
+                url = outbound_url(link)
+                if not url:
+                    continue
+                entry = module_links.setdefault(url, {"text": link["text"], "url": url, "tabs": [], "visible": False})
+                if tab not in entry["tabs"]:
+                    entry["tabs"].append(tab)
+                entry["visible"] = entry["visible"] or link["visible"]
+                if not entry["text"]:
+                    entry["text"] = link["text"]
+
+    def check(self, module, checker):
+        """
+        Checks all of a module's links concurrently (the checker applies its per-host limits).
+        """
+        entries = list(self.links.get(module, {}).values())
+        results = checker.check_many([entry["url"] for entry in entries])
+        for entry in entries:
+            result = results[entry["url"]]
+            entry["ok"], entry["status"] = result.ok, result.status
+        return results
+
+    def diff(self, manifest):
+        report = {}
+        for module in sorted(set(self.links) | set(self.texts)):
+            expected = {}
+            for tab in manifest.tabs(module):
+                expected.update(manifest.links(module, tab))
+            entries = list(self.links.get(module, {}).values())
+            texts = sorted(self.texts.get(module, set()))
+
+            matcher = get_text_matcher(expected)
+            present = matcher.match(texts)
+            entry_matches = [(entry, matcher.search(entry["text"])) for entry in entries]
+
+            removed, unexpected = [], []
+            for link_text, expected_url_part in expected.items():
+                if not present[link_text]:
+                    removed.append({"text": link_text, "expected": expected_url_part})
+                    continue
+                urls = [entry["url"] for entry, found in entry_matches if link_text in found]
+                if urls and not any(_clean(expected_url_part) in _clean(url) for url in urls):
+                    unexpected.append({"text": link_text, "expected": expected_url_part, "found": urls})
+
+            covered_parts = [part for part in (_clean(value) for value in expected.values()) if part]
+            new = [
+                entry for entry, found in entry_matches
+                if not found and not any(part in _clean(entry["url"]) for part in covered_parts)
+            ]
+            report[module] = {"new": new, "removed": removed, "unexpected": unexpected}
+        return report
+
+    def save(self, path, manifest):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            links = {module: sorted(entries.values(), key=lambda e: e["url"]) for module, entries in self.links.items()}
+        diff = self.diff(manifest)
+        report = {"created_at": datetime.now().isoformat(timespec="seconds"), "links": links, "diff": diff}
+        path.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+
+        for module, changes in diff.items():
+            logger.info(f"🕸️ {module}: {len(links.get(module, []))} outbound links, {len(changes['new'])} new, "
+                        f"{len(changes['removed'])} removed, {len(changes['unexpected'])} unexpected")
+        logger.info(f"🕸️ Link inventory written to {path}")
+        return report
@@ -0,0 +1,141 @@
+import gzip
+import json
+import logging
+import threading
+import time
+from collections import deque
+
+
+class LokiHandler(logging.Handler):
+    """
+    Non-blocking Loki log shipper.
+    emit() only formats the record and appends it to a bounded in-memory buffer.
+    A background thread batches records into one multi-value stream per level
+    and pushes them when `batch_size` records are waiting or every `flush_interval` seconds.
+    When the buffer is full, `drop_policy` decides what is lost: "drop_oldest" or "drop_newest".
+    """
+
+    DROP_OLDEST = "drop_oldest"
+    DROP_NEWEST = "drop_newest"
+
+    def __init__(self, url, job_name, batch_size=200, flush_interval=2.0, buffer_size=10000,
+                 gzip_enabled=False, drop_policy=DROP_OLDEST, timeout=2):
+        super().__init__()
+        self.url = url
+        self.job_name = job_name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.buffer_size = buffer_size
+        self.gzip_enabled = gzip_enabled
+        self.drop_policy = drop_policy
+        self.timeout = timeout
+
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
+
+        self._buffer = deque()
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._closing = False
+        self._flush_requested = False  # push partial batches without waiting, until the buffer is empty
+        self._worker = None
+        self._session = None
+
+    def emit(self, record):
+        try:
+            entry = (record.levelname.lower(), str(time.time_ns()), self.format(record))
+        except Exception:
+            self.handleError(record)
+            return
+
+        with self._cond:
+            if self._closing:
+                return
+            if len(self._buffer) >= self.buffer_size:
+                self.dropped += 1
+                if self.drop_policy == self.DROP_NEWEST:
+                    return
+                self._buffer.popleft()
+            self._buffer.append(entry)
+
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="loki-shipper", daemon=True)
+                self._worker.start()
+            if len(self._buffer) >= self.batch_size:
+                self._cond.notify()
+
+    def flush(self, timeout=5.0):
+        """
+        Asks the shipper to push everything buffered now and waits up to `timeout` seconds for it.
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+            while (self._buffer or self._in_flight) and self._worker is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+    def close(self):
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+            worker = self._worker
+        if worker is not None:
+            worker.join(timeout=max(self.timeout * 2, 5))
+        if self._session is not None:
+            self._session.close()
+        super().close()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not (self._closing or self._flush_requested) and len(self._buffer) < self.batch_size:
+                    self._cond.wait(self.flush_interval)
+                if not self._buffer:
+                    self._flush_requested = False
+                    if self._closing:
+                        return
+                    continue
+                batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+                self._in_flight = len(batch)
+
+            self._push(batch)
+
+            with self._cond:
+                self._in_flight = 0
+                self._cond.notify_all()
+
+    def _push(self, batch):
+        streams = {}
+        for level, ts, message in batch:
+            streams.setdefault(level, []).append([ts, message])
+        payload = {
+            "streams": [
+                {"stream": {"job": self.job_name, "level": level}, "values": values}
+                for level, values in streams.items()
+            ]
+        }
+
+        body = json.dumps(payload).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if self.gzip_enabled:
+            body = gzip.compress(body)
+            headers["Content-Encoding"] = "gzip"
+
+        try:
+            if self._session is None:
+                # Imported by the shipper thread on its first push, so attaching the handler costs nothing
+                import requests
+                self._session = requests.Session()
+            response = self._session.post(self.url, data=body, headers=headers, timeout=self.timeout)
+            if response.status_code >= 400:
+                self.failed += len(batch)
+            else:
+                self.sent += len(batch)
+        except Exception:
+            # Loki being slow or absent must never affect the test run
+            self.failed += len(batch)
@@ -0,0 +1,41 @@
+from pages.business_page import BusinessLicensePage
+from pages.daycare_page import DaycarePage
+from pages.education_page import EducationPage
+from pages.enfo_page import EnforcementPage
+from pages.parking_page import ParkingPage
+from pages.street_page import StreetPage
+from pages.water_page import WaterPage
+
+# How to reach every tab of each module, shared by the benchmarks and the link crawler.
+# module -> (page class, secrets key, open method, [(manifest tab, switch to the tab or None for the landing tab)])
+# Education's student file side tab needs a student login and is left out.
+MODULE_TABS = {
+    "water": (WaterPage, "water_url", "open_water_page", [
+        ("default_tab", None),
+        ("tab_2", lambda p: p.navigate_to_tab_2()),
+        ("tab_3", lambda p: p.navigate_to_tab_3()),
+    ]),
+    "education": (EducationPage, "education_url", "open_education_page", [("default_tab", None)] + [
+        (tab, lambda p, name=name: p.navigate_to_side_tab(name))
+        for name, tab in EducationPage.SIDE_TABS.items() if tab != "student_file"
+    ]),
+    "business": (BusinessLicensePage, "business_url", "open_business_page", [
+        ("tab_1", None),
+        ("tab_2", lambda p: p.navigate_to_tab_2()),
+        ("tab_3", lambda p: p.navigate_to_tab_3()),
+    ]),
+    "daycare": (DaycarePage, "daycare_url", "open_daycare_page", [
+        ("tab_1", None),
+        ("tab_2", lambda p: p.navigate_to_daycare_tab()),
+    ]),
+    "parking": (ParkingPage, "parking_url", "open_parking_page", [
+        ("tab_1", None),
+        ("tab_3", lambda p: p.navigate_to_tab_3()),
+    ]),
+    "enforcement": (EnforcementPage, "enforcement_url", "open_enforcement_page", [
+        ("tab_1", None),
+    ]),
+    "street": (StreetPage, "street_url", "open_street_page", [
+        ("search", None),
+    ]),
+}
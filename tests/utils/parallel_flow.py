@@ -0,0 +1,98 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import allure
+from playwright.sync_api import sync_playwright
+
+logger = logging.getLogger("SystemFlowLogger")
+
+
+class ModuleOutcome:
+    """
+    Everything a single module run produced, merged into the test's summary afterwards.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.failures = []
+        self.attachments = []  # (body, name, attachment_type)
+        self.duration = 0.0
+
+
+class LiveReporter:
+    """
+    Reports straight to Allure. Used when modules run on the test's own thread.
+    """
+
+    def step(self, title):
+        return allure.step(title)
+
+    def attach(self, body, name, attachment_type):
+        allure.attach(body, name=name, attachment_type=attachment_type)
+
+
+class BufferedReporter:
+    """
+    Same API as LiveReporter, but keeps attachments on the ModuleOutcome.
+    Allure's lifecycle is bound to the test thread, so worker threads must not call it directly.
+    """
+
+    def __init__(self, outcome):
+        self.outcome = outcome
+
+    @contextmanager
+    def step(self, title):
+        logger.info(f"[{self.outcome.name}] {title}")
+        yield
+
+    def attach(self, body, name, attachment_type):
+        self.outcome.attachments.append((body, name, attachment_type))
+
+
+def replay_outcome(outcome, step_title):
+    """
+    Re-creates a worker's Allure step and attachments on the test thread.
+    """
+    with allure.step(step_title):
+        for body, name, attachment_type in outcome.attachments:
+            allure.attach(body, name=name, attachment_type=attachment_type)
+
+
+def _run_in_new_context(name, task, cdp_endpoint, context_args, context_setup):
+    # Sync Playwright objects are bound to the thread that created them,
+    # so every worker opens its own driver connection to the shared browser.
+    started = time.monotonic()
+    try:
+        with sync_playwright() as playwright:
+            browser = playwright.chromium.connect_over_cdp(cdp_endpoint)
+            context = browser.new_context(**(context_args or {}))
+            try:
+                if context_setup is not None:
+                    context_setup(context, name)
+                outcome = task(context.new_page())
+            finally:
+                context.close()
+    except Exception as e:
+        logger.error(f"❌ Worker for {name} could not run: {e}")
+        outcome = ModuleOutcome(name)
+        outcome.failures.append(f"{name}: {str(e)}")
+
+    outcome.duration = time.monotonic() - started
+    return outcome
+
+
+def run_in_parallel_contexts(tasks, cdp_endpoint, workers, context_args=None, context_setup=None):
+    """
+    Runs each (name, task) pair in its own BrowserContext on the shared browser at `cdp_endpoint`,
+    at most `workers` at a time. `task(page)` must return a ModuleOutcome.
+    `context_setup(context, name)`, if given, runs on each new context before its page is opened.
+    Outcomes are returned in the order of `tasks`.
+    """
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="flow-module") as executor:
+        futures = [
+            executor.submit(_run_in_new_context, name, task, cdp_endpoint, context_args, context_setup)
+            for name, task in tasks
+        ]
+        return [future.result() for future in futures]
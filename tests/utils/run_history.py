@@ -0,0 +1,255 @@
+import argparse
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from pages.link_results import VERIFY_STRATEGIES
+
+logger = logging.getLogger("SystemFlowLogger")
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at REAL NOT NULL,
+    finished_at REAL NOT NULL,
+    exit_status INTEGER,
+    run_env TEXT
+);
+CREATE TABLE IF NOT EXISTS module_durations (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    module TEXT NOT NULL,
+    seconds REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS link_results (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    module TEXT, tab TEXT, link_text TEXT, url TEXT, host TEXT,
+    status TEXT, ok INTEGER, strategy TEXT, latency REAL, attempts INTEGER
+);
+CREATE TABLE IF NOT EXISTS tab_timings (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    module TEXT NOT NULL,
+    tab TEXT NOT NULL,
+    seconds REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS wait_timings (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    module TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    seconds REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS link_results_run ON link_results(run_id, ok);
+CREATE INDEX IF NOT EXISTS link_results_host ON link_results(host);
+CREATE INDEX IF NOT EXISTS tab_timings_run ON tab_timings(run_id);
+"""
+
+# Spans that make up the time spent on a tab
+TAB_SPANS = ("tab_switch", "verify_links")
+# Strategies whose latency is a real request (not a cache hit, a skip or a refused host)
+LIVE_STRATEGIES_EXCLUDED = VERIFY_STRATEGIES + ("cache", "skip", "offline", "circuit_open")
+
+
+class RunHistory:
+    """
+    Local SQLite history of nightly runs: module durations, per-link statuses and latencies, tab and wait timings.
+    Everything a run produced is written at session end in one transaction with batched inserts.
+    RUN_HISTORY_PATH (or --run-history) sets the database, RUN_HISTORY=off disables it.
+    """
+
+    DEFAULT_PATH = PROJECT_ROOT / "history" / "run_history.db"
+
+    def __init__(self, path=None, enabled=None):
+        self.path = Path(path or os.getenv("RUN_HISTORY_PATH") or self.DEFAULT_PATH)
+        self.enabled = os.getenv("RUN_HISTORY", "on").strip().lower() not in ("off", "0", "false") if enabled is None else enabled
+        self.started_at = time.time()
+        self._module_durations = []
+        self._lock = threading.Lock()
+
+    def add_module_duration(self, module, seconds):
+        with self._lock:
+            self._module_durations.append((module, seconds))
+
+    def record_run(self, link_results, spans, wait_summary, exit_status=None):
+        """
+        Appends this run. Returns the new run id, or None when disabled or the run checked nothing.
+        """
+        with self._lock:
+            module_durations = list(self._module_durations)
+        if not self.enabled or not (link_results or module_durations):
+            return None
+
+        tab_seconds = {}
+        for span in spans:
+            module, tab = span.attributes.get("module"), span.attributes.get("tab")
+            if span.name in TAB_SPANS and module and tab:
+                tab_seconds[(module, tab)] = tab_seconds.get((module, tab), 0.0) + span.duration
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self._connect() as connection:
+                run_id = connection.execute(
+                    "INSERT INTO runs (started_at, finished_at, exit_status, run_env) VALUES (?, ?, ?, ?)",
+                    (self.started_at, time.time(), exit_status, os.getenv("RUN_ENV", "")),
+                ).lastrowid
+                connection.executemany(
+                    "INSERT INTO module_durations VALUES (?, ?, ?)",
+                    [(run_id, module, seconds) for module, seconds in module_durations],
+                )
+                connection.executemany(
+                    "INSERT INTO link_results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(run_id, r.module, r.tab, r.link_text, r.url, _host(r.url), str(r.status), int(r.ok),
+                      r.strategy, r.latency, r.attempts) for r in link_results],
+                )
+                connection.executemany(
+                    "INSERT INTO tab_timings VALUES (?, ?, ?, ?)",
+                    [(run_id, module, tab, seconds) for (module, tab), seconds in tab_seconds.items()],
+                )
+                connection.executemany(
+                    "INSERT INTO wait_timings VALUES (?, ?, ?, ?, ?)",
+                    [(run_id, module, kind, row["count"], row["seconds"])
+                     for module, kinds in wait_summary.items() for kind, row in kinds.items()],
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Failed to write run history to {self.path}: {e}")
+            return None
+        logger.info(f"🗄️ Run {run_id} saved to {self.path} ({len(link_results)} link results)")
+        return run_id
+
+    # --- Queries ---
+
+    def broken_links(self, runs=5):
+        """
+        Links whose HTTP check failed in any of the last `runs` runs, most often broken first:
+        [(module, link_text, url, runs broken, last status)].
+        """
+        with self._connect() as connection:
+            rows = connection.execute(
+                f"""
+                SELECT module, link_text, url, run_id, status FROM link_results
+                WHERE ok = 0 AND run_id IN (SELECT id FROM runs ORDER BY id DESC LIMIT ?)
+                  AND strategy NOT IN ({",".join("?" * len(VERIFY_STRATEGIES))})
+                ORDER BY run_id
+                """,
+                (runs, *VERIFY_STRATEGIES),
+            ).fetchall()
+        by_link = {}
+        for module, link_text, url, run_id, status in rows:
+            entry = by_link.setdefault((module, url), {"link_text": link_text, "runs": set(), "status": status})
+            entry["runs"].add(run_id)
+            entry["status"] = status
+            entry["link_text"] = entry["link_text"] or link_text
+        table = [(module, entry["link_text"], url, len(entry["runs"]), entry["status"])
+                 for (module, url), entry in by_link.items()]
+        return sorted(table, key=lambda row: (-row[3], row[0], row[2]))
+
+    def host_latency_p95(self, days=7):
+        """
+        p95 and median latency of live HTTP checks per host over the last `days` days: [(host, checks, p50, p95)].
+        """
+        with self._connect() as connection:
+            rows = connection.execute(
+                f"""
+                SELECT host, latency FROM link_results JOIN runs ON runs.id = link_results.run_id
+                WHERE runs.started_at >= ? AND host != ''
+                  AND strategy NOT IN ({",".join("?" * len(LIVE_STRATEGIES_EXCLUDED))})
+                """,
+                (time.time() - days * 86400, *LIVE_STRATEGIES_EXCLUDED),
+            ).fetchall()
+        by_host = {}
+        for host, latency in rows:
+            by_host.setdefault(host, []).append(latency)
+        table = [(host, len(values), _percentile(values, 50), _percentile(values, 95)) for host, values in by_host.items()]
+        return sorted(table, key=lambda row: -row[3])
+
+    def slowest_tabs(self, days=7, limit=10):
+        """
+        Tabs by average time (switch + verification) over the last `days` days: [(module, tab, runs, avg, max)].
+        """
+        with self._connect() as connection:
+            return connection.execute(
+                """
+                SELECT module, tab, COUNT(*), AVG(seconds), MAX(seconds)
+                FROM tab_timings JOIN runs ON runs.id = tab_timings.run_id
+                WHERE runs.started_at >= ?
+                GROUP BY module, tab
+                ORDER BY AVG(seconds) DESC
+                LIMIT ?
+                """,
+                (time.time() - days * 86400, limit),
+            ).fetchall()
+
+    @contextmanager
+    def _connect(self):
+        """ A connection whose statements form one transaction, committed on success and always closed. """
+        connection = sqlite3.connect(self.path)
+        try:
+            connection.executescript(SCHEMA)
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+
+def _host(url):
+    return (urlsplit(url).hostname or "").lower() if url else ""
+
+
+def _percentile(values, percentile):
+    """ Nearest-rank percentile. """
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percentile / 100 * len(ordered)) - 1)]
+
+
+_shared_history = None
+_shared_history_lock = threading.Lock()
+
+
+def get_run_history():
+    global _shared_history
+    with _shared_history_lock:
+        if _shared_history is None:
+            _shared_history = RunHistory()
+        return _shared_history
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the link check run history.")
+    parser.add_argument("--db", default=None, help=f"History database (default: RUN_HISTORY_PATH or {RunHistory.DEFAULT_PATH})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    broken = commands.add_parser("broken", help="Links broken in the last N runs")
+    broken.add_argument("--runs", type=int, default=5)
+    hosts = commands.add_parser("hosts", help="p95 latency per host")
+    hosts.add_argument("--days", type=int, default=7)
+    tabs = commands.add_parser("slowest-tabs", help="Slowest tabs")
+    tabs.add_argument("--days", type=int, default=7)
+    tabs.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    history = RunHistory(args.db)
+    if not history.path.exists():
+        parser.error(f"No run history at {history.path}")
+
+    if args.command == "broken":
+        print(f"{'Runs':>5}  {'Module':<12} {'Last status':<24} Link / URL")
+        for module, link_text, url, broken_runs, last in history.broken_links(args.runs):
+            print(f"{broken_runs:>5}  {module:<12} {last[:24]:<24} {link_text or '-'} / {url}")
+    elif args.command == "hosts":
+        print(f"{'Host':<40}{'Checks':>8}{'p50':>9}{'p95':>9}")
+        for host, checks, p50, p95 in history.host_latency_p95(args.days):
+            print(f"{host:<40}{checks:>8}{p50:>8.2f}s{p95:>8.2f}s")
+    else:
+        print(f"{'Module':<14}{'Tab':<16}{'Runs':>6}{'Avg':>9}{'Max':>9}")
+        for module, tab, runs, average, longest in history.slowest_tabs(args.days, args.limit):
+            print(f"{module:<14}{tab:<16}{runs:>6}{average:>8.2f}s{longest:>8.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,33 @@
 # secrets_loader.py
 
+import copy
+import logging
 import os
-from dotenv import load_dotenv
+from functools import lru_cache
 from pathlib import Path
 
+logger = logging.getLogger("SystemFlowLogger")
+
+# The .env file is in the project root, three levels above this file (utils/ -> tests/ -> root)
+DOTENV_PATH = Path(__file__).resolve().parent.parent.parent / ".env"
+
+
 def load_secrets():
     """
-    Loads configuration data from a .env file using an absolute path calculation.
-    The code assumes that the .env file is located in the project root,
-    three levels above this file.
+    Loads configuration data from the project's .env file.
+    The file is read once per process; every call returns its own copy of the result,
+    or None when the environment variables are missing.
     """
-    
-    # 1. Determine the absolute path of the secrets_loader.py file
-    script_path = Path(__file__).resolve() 
-    
-    # 2. Calculate the project root (move up from utils/ to tests/ and then to links/)
-    project_root = script_path.parent.parent.parent
-    
-    # 3. Build the full path to the .env file
-    dotenv_path = project_root / ".env"
-    
-    # Print the path being passed to load_dotenv()
-    print(f"*** Attempting to load .env from absolute path: {dotenv_path}") 
-    
-    # Load environment variables from .env file
-    load_dotenv(dotenv_path=dotenv_path)
+    secrets = _read_secrets()
+    return copy.deepcopy(secrets) if secrets else None
+
+
+@lru_cache(maxsize=None)
+def _read_secrets():
+    from dotenv import load_dotenv
+
+    logger.debug(f"Loading .env from {DOTENV_PATH}")
+    load_dotenv(dotenv_path=DOTENV_PATH)
 
     # Retrieve all credentials using os.getenv()
     secrets = {
@@ -45,9 +48,9 @@ def load_secrets():
 
     # Basic validation to ensure essential variables are loaded
     if not secrets['business_url']: # Check one of the URLs as a sample
-        print(f"❌ Error: Environment variables not found. Ensure .env file exists at {dotenv_path} and is configured correctly.")
+        logger.error(f"❌ Environment variables not found. Ensure .env file exists at {DOTENV_PATH} and is configured correctly.")
         return None
-        
+
     return secrets
 
 # --- Verification ---
@@ -57,3 +60,5 @@ if __name__ == '__main__':
         print("\n✅ Secrets loading successful!")
         # Optional: Print loaded data for verification, but be careful with sensitive info
         # print(f"Loaded data: {data}")
+    else:
+        print(f"❌ Error: Environment variables not found at {DOTENV_PATH}")
@@ -1,6 +1,4 @@
 from pathlib import Path
-import sys
-from sys import path
 import time
 from datetime import datetime
 import logging
@@ -9,10 +7,7 @@ from playwright.sync_api import Page
 
 current_file_path = Path(__file__).resolve()
 project_root = current_file_path.parent.parent
-if str(project_root) not in path:
-    path.append(str(project_root))
 
-from tests.utils.secrets_loader import load_secrets
 from pages.water_page import WaterPage
 
 logger = logging.getLogger("SystemFlowLogger")